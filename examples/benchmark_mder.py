@@ -0,0 +1,104 @@
+"""
+Measure the segment download throughput of `mder.m3u8_downloader` against a local HTTP server serving synthetic .ts files.
+
+The server sleeps `--connect-latency` ms for every new connection, to stand in for the TCP/TLS handshake of a remote server.
+The downloader is compared with the old engine, which calls `requests.get` (a new connection) for every segment.
+
+```bash
+python benchmark_mder.py --segments 500 --size 256 --threads 10 50 200 --connect-latency 20
+```
+"""
+from Kkit import mder
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+import argparse
+import os
+import tempfile
+import time
+import requests
+
+
+class SegmentHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"   # keep the connections alive
+    connections = 0
+
+    def setup(self):
+        super().setup()
+        type(self).connections += 1
+        time.sleep(self.server.connect_latency)
+
+    def do_GET(self):
+        body = self.server.segment
+        self.send_response(200)
+        self.send_header("Content-Type", "video/mp2t")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def start_server(segment_size, connect_latency):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SegmentHandler)
+    server.daemon_threads = True
+    server.request_queue_size = 1024
+    server.segment = os.urandom(segment_size)
+    server.connect_latency = connect_latency
+    Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def write_playlist(path, base_url, num_of_segments):
+    with open(path, "w") as f:
+        f.write("#EXTM3U\n#EXT-X-TARGETDURATION:4\n")
+        for i in range(num_of_segments):
+            f.write(f"#EXTINF:4.0,\n{base_url}/seg_{i:05d}.ts\n")
+        f.write("#EXT-X-ENDLIST\n")
+
+def download_per_request(urls, folder, num_of_threads):
+    # the old engine: static sharding and a new connection for every segment
+    def worker(shard):
+        for url in shard:
+            res = requests.get(url, timeout=60)
+            with open(os.path.join(folder, url.split("/")[-1]), "wb") as f:
+                f.write(res.content)
+    threads = [Thread(target=worker, args=(urls[i::num_of_threads],)) for i in range(num_of_threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the segment downloader of mder.")
+    parser.add_argument("--segments", type=int, default=500, help="The number of segments. Default is 500.")
+    parser.add_argument("--size", type=int, default=256, help="The size of a segment in KB. Default is 256.")
+    parser.add_argument("--threads", type=int, nargs="+", default=[10, 50, 200], help="The numbers of threads to test. Default is 10 50 200.")
+    parser.add_argument("--connections", type=int, default=None, help="The maximum number of connections per host. Default is the number of threads.")
+    parser.add_argument("--connect-latency", type=float, default=20, help="The latency of a new connection in ms. Default is 20.")
+    args = parser.parse_args()
+
+    server = start_server(args.size*1024, args.connect_latency/1000)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    total_mb = args.segments*args.size/1024
+
+    results = []
+    for num_of_threads in args.threads:
+        for engine in ("per request", "session"):
+            with tempfile.TemporaryDirectory() as folder:
+                urls = [f"{base_url}/seg_{i:05d}.ts" for i in range(args.segments)]
+                SegmentHandler.connections = 0
+                start_time = time.perf_counter()
+                if engine == "per request":
+                    download_per_request(urls, folder, num_of_threads)
+                else:
+                    playlist = os.path.join(folder, "test.m3u8")
+                    write_playlist(playlist, base_url, args.segments)
+                    downloader = mder.m3u8_downloader(playlist, temp_file_path=folder, mp4_path=os.path.join(folder, "test.mp4"),
+                                                      num_of_threads=num_of_threads, max_connections_per_host=args.connections)
+                    downloader.start(mod=0)
+                elapsed = time.perf_counter() - start_time
+                results.append((engine, num_of_threads, elapsed, SegmentHandler.connections))
+
+    print(f"{'engine':>12} {'threads':>8} {'time':>9} {'MB/s':>9} {'connections':>12}")
+    for engine, num_of_threads, elapsed, connections in results:
+        print(f"{engine:>12} {num_of_threads:>8} {elapsed:>8.3f}s {total_mb/elapsed:>9.1f} {connections:>12}")
+    server.shutdown()
@@ -0,0 +1,100 @@
+"""
+Measure the extraction speed of `scaling_code.Data.generate` on a synthetic scaling log.
+
+The log repeats a block of three sections with `--noise` noise lines (compiler output, progress messages) between the data lines, until it reaches `--size` MB.
+`Data.generate` is compared with the old engine, which scans the file once per section and calls `re.match` and `re.findall` with the pattern strings for every line.
+
+```bash
+python benchmark_scaling_code.py --size 1024 --noise 20
+```
+"""
+from Kkit.scaling_code import Data, Section, Line
+import argparse
+import os
+import random
+import re
+import tempfile
+import time
+import pandas as pd
+
+
+data = Data(
+    Section(
+        Line("MKL number of threads: $$", "N_threads"),
+        Line("cmkl_permut total time: $$", "cfunc_time"),
+        Line("cmkl_permut permutation time: $$", "permut_time")
+    ),
+    Section(
+        Line("Function permutation_mkl took $$ seconds to run.", "python_func_time")
+    ),
+    Section(
+        Line("rank $$ memory: $$ MB", "rank", "memory")
+    )
+)
+
+NOISE = [
+    "compiling kernel permutation_mkl ...",
+    "progress: 50% done, please wait",
+    "warning: the affinity of thread 3 is not set",
+    "INFO 2024-01-01 12:00:00 job started on node cn001",
+]
+
+def write_log(path, size, noise=10):
+    random.seed(0)
+    written = 0
+    with open(path, "w") as f:
+        while written < size:
+            lines = [
+                f"MKL number of threads: {random.randint(1, 128)}",
+                f"cmkl_permut total time: {random.random():.6f}",
+                f"cmkl_permut permutation time: {random.random():.6f}",
+                f"Function permutation_mkl took {random.random():.6f} seconds to run.",
+                f"rank {random.randint(0, 63)} memory: {random.randint(100, 9999)} MB",
+            ]
+            for _ in range(noise):
+                lines.insert(random.randint(0, len(lines)), random.choice(NOISE))
+            block = "\n".join(lines+[""])+"\n"
+            f.write(block*100)
+            written += len(block)*100
+
+def generate_per_section(data, file_path):
+    # the old engine: one scan of the file per section, the pattern strings are matched and searched again for every line
+    data_pattern = r" ?(\d+\.?\d*) ?"
+    with open(file_path, "r") as f:
+        lines = [i.rstrip("\n") for i in f.readlines() if i.rstrip("\n")!=""]
+    result = {}
+    for s in data.sections:
+        index = 0
+        for line in lines:
+            l = s.lines[index%len(s.lines)]
+            if re.match(l.full_pattern, line):
+                index += 1
+                values = re.findall(data_pattern, line)
+                values = [float(i) for i in values] if all("." in i for i in values) else [int(i) for i in values]
+                for label, value in zip(l.labels, values):
+                    result.setdefault(label, []).append(value)
+    return pd.DataFrame(result)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the extraction of scaling_code.")
+    parser.add_argument("--size", type=int, default=1024, help="The size of the synthetic log in MB. Default is 1024.")
+    parser.add_argument("--noise", type=int, default=10, help="The number of noise lines for every 5 data lines. Default is 10.")
+    parser.add_argument("--no-baseline", action="store_true", help="Do not run the old engine.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "scaling.log")
+        write_log(path, args.size*1024*1024, args.noise)
+        engines = [("single pass", data.generate)]
+        if not args.no_baseline:
+            engines.insert(0, ("per section", lambda file_path: generate_per_section(data, file_path)))
+        frames = []
+        print(f"{'engine':>12} {'time':>9} {'MB/s':>9} {'rows':>10}")
+        for engine, generate in engines:
+            start_time = time.perf_counter()
+            frame = generate(path)
+            elapsed = time.perf_counter() - start_time
+            frames.append(frame)
+            print(f"{engine:>12} {elapsed:>8.2f}s {args.size/elapsed:>9.1f} {len(frame):>10}")
+        if len(frames) == 2:
+            print("same result:", frames[0].equals(frames[1]))
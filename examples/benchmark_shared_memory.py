@@ -0,0 +1,71 @@
+"""
+Compare passing large buffers to a remote object through the pipe and through shared memory.
+
+```bash
+python benchmark_shared_memory.py               # 1 KB ~ 1 GB
+python benchmark_shared_memory.py --max-size 64 # 1 KB ~ 64 MB
+python benchmark_shared_memory.py --numpy       # NumPy arrays instead of bytearray
+```
+"""
+from Kkit.child_process import RemoteObjectProxy
+import argparse
+import time
+
+
+class Echo:
+    def size(self, buf):
+        return len(buf)
+
+    def echo(self, buf):
+        return buf
+
+def obj_creator():
+    return Echo()
+
+def best_time(func, buf, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        func(buf)
+        best = min(best, time.perf_counter() - start_time)
+    return best
+
+def format_size(size):
+    for unit in ["B", "KB", "MB", "GB"]:
+        if size < 1024:
+            return f"{size:.0f} {unit}"
+        size /= 1024
+    return f"{size:.0f} TB"
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the shared memory transport of RemoteObjectProxy.")
+    parser.add_argument("--max-size", type=int, default=1024, help="The largest payload in MB. Default is 1024 (1 GB).")
+    parser.add_argument("--threshold", type=int, default=64*1024, help="The shared memory threshold in bytes. Default is 64 KB.")
+    parser.add_argument("--repeat", type=int, default=3, help="Repeat times of every case, the best time is reported.")
+    parser.add_argument("--numpy", action="store_true", help="Use NumPy arrays as payload.")
+    args = parser.parse_args()
+
+    pipe_obj = RemoteObjectProxy(obj_creator, paralle_execution=False)
+    shm_obj = RemoteObjectProxy(obj_creator, paralle_execution=False, proxy_shared_memory_threshold=args.threshold)
+
+    print(f"{'payload':>10} {'pipe args':>12} {'shm args':>12} {'pipe echo':>12} {'shm echo':>12}")
+    size = 1024
+    while size <= args.max_size*1024*1024:
+        if args.numpy:
+            import numpy as np
+            buf = np.ones(size, dtype=np.uint8)
+        else:
+            buf = bytearray(size)
+        repeat = args.repeat if size < 256*1024*1024 else 1
+        times = [
+            best_time(pipe_obj.size, buf, repeat),
+            best_time(shm_obj.size, buf, repeat),
+            best_time(pipe_obj.echo, buf, repeat),
+            best_time(shm_obj.echo, buf, repeat),
+        ]
+        print(f"{format_size(size):>10} " + " ".join(f"{t*1000:>10.3f}ms" for t in times))
+        del buf
+        size *= 4
+
+    pipe_obj.close()
+    shm_obj.close()
@@ -0,0 +1,62 @@
+"""
+Measure the start up latency of RemoteObjectProxy with every start method of multiprocessing.
+
+The parent imports the `--preload` modules and holds `--ballast` MB of memory to look like a heavyweight parent process.
+
+```bash
+python benchmark_start_method.py --num 32 --ballast 1024 --preload numpy
+```
+"""
+from Kkit.child_process import RemoteObjectProxy, RemoteObjectPool, start_forkserver
+import argparse
+import importlib
+import multiprocessing
+import time
+
+
+class Worker:
+    def ping(self):
+        return "pong"
+
+def obj_creator():
+    return Worker()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the start up latency of RemoteObjectProxy.")
+    parser.add_argument("--num", type=int, default=16, help="The number of remote objects. Default is 16.")
+    parser.add_argument("--ballast", type=int, default=512, help="The memory held by the parent process in MB. Default is 512.")
+    parser.add_argument("--preload", nargs="*", default=[], help="The modules imported by the parent and preloaded by the fork server.")
+    args = parser.parse_args()
+
+    for module in args.preload:
+        importlib.import_module(module)
+    ballast = bytearray(args.ballast*1024*1024)
+    for i in range(0, len(ballast), 4096):
+        ballast[i] = 1   # touch every page
+
+    print(f"{'method':>12} {'first':>10} {'one by one':>12} {'pool':>10}")
+    for method in multiprocessing.get_all_start_methods():
+        preload = args.preload if method == "forkserver" else ()
+        start_time = time.perf_counter()
+        if method == "forkserver":
+            start_forkserver(preload)   # the first remote object waits for the fork server to import `preload`
+        first = RemoteObjectProxy(obj_creator, paralle_execution=False, proxy_context=method, proxy_preload=preload)
+        first.ping()
+        first_time = time.perf_counter() - start_time
+        first.close()
+
+        start_time = time.perf_counter()
+        objs = [RemoteObjectProxy(obj_creator, paralle_execution=False, proxy_context=method, proxy_preload=preload) for _ in range(args.num)]
+        for obj in objs:
+            obj.ping()
+        one_by_one_time = time.perf_counter() - start_time
+        for obj in objs:
+            obj.close()
+
+        start_time = time.perf_counter()
+        pool = RemoteObjectPool(obj_creator, num_of_workers=args.num, paralle_execution=False, proxy_context=method, proxy_preload=preload)
+        pool.ping()
+        pool_time = time.perf_counter() - start_time
+        pool.close()
+
+        print(f"{method:>12} {first_time:>9.3f}s {one_by_one_time:>11.3f}s {pool_time:>9.3f}s")
@@ -30,7 +30,7 @@ setuptools.setup(
     extras_require={
         "color" : ["haishoku", "colorsys", "numpy", "requests"],
         "encryption" : ["cryptography"],
-        "mder" : ["requests", "tqdm"],
+        "mder" : ["requests", "tqdm", "cryptography"],
         "scaling" : ["pandas"],
         "str2latex" : ["numpy"],
         "llm" : ["fastapi", "torch", "torchvision", "torchaudio", "uvicorn", "wandb",
@@ -9,18 +9,43 @@ The Remote Object in child process can be created by `RemoteObjectProxy`.
     2. The instance's function can be called like normal object.
     3. The Exception will be raised in parent process if the instance in child process raise Exception.
 
-**In parallel mode**(paralle_execution=True), The instance's attributes can be accessed like normal object in parent process. The instance's function can be called like normal object in parent process, but the return value is a `multiprocessing.Pipe` object, you need call recv() to get the return value. The Exception will be returned to parent process instead of raised in parent process.
+**In parallel mode**(paralle_execution=True), The instance's attributes can be accessed like normal object in parent process. The instance's function can be called like normal object in parent process, but the return value is a `RemoteFuture` object (a `concurrent.futures.Future`), you need call recv() or result() to get the return value. The Exception will be returned to parent process instead of raised in parent process by recv(), and raised by result().
 
     1. The instance's attributes can be accessed like normal object.
-    2. The instance's function can be called like normal object, but the return value is a `multiprocessing.Pipe` object.
+    2. The instance's function can be called like normal object, but the return value is a `RemoteFuture` object.
     3. The Exception will be returned to parent process instead of raised in parent process.
 
-The `ParallelResultFetcher` is used to fetch the return value of parallel execution.
+Every call carries a request ID, so many calls can be in flight on the same proxy at the same time. With `proxy_num_of_threads`, the child process runs the calls on a thread pool, which gives I/O bound remote objects real concurrency without spawning more processes.
+
+The `ParallelResultFetcher` is used to fetch the return value of parallel execution. Besides `wait_all_results()`, `as_completed()` yields the results in the order they finish and `wait(timeout, return_when=FIRST_COMPLETED)` returns as soon as any result arrives. Every proxy has a background thread that resolves its `RemoteFuture`s as the replies arrive, so both of them wait on the futures of all child processes at once by `concurrent.futures.wait`.
+
+The names of the remote object's methods and attributes are cached in the proxy when the remote object is created, so a method call costs only one round trip to the child process. Attributes listed in `proxy_immutable_attrs` are cached together with their values and read without touching the child process at all. Use `refresh_schema()` if the remote object gains new methods or attributes later.
+
+The `RemoteObjectPool` keeps several replicas of the same remote object in pre-started worker processes. The replicas are created in parallel, and each method call is dispatched to whichever replica is idle, so a burst of calls spreads across cores instead of queueing behind one pipe. In parallel mode a call on the pool returns the `RemoteFuture` of the chosen replica.
+
+`map(method, iterable, chunksize)` calls a method with every item of an iterable, the calls are shipped in chunks and every chunk costs one message, which is much faster than calling the method item by item for chatty workloads.
+
+The proxies watch the liveness of their child processes: if a child process dies, the running calls fail with `RemoteProcessError` instead of blocking forever. `proxy_call_timeout` limits the time of a call, a child process that does not reply in time is regarded as hung and killed, and `proxy_max_restarts` restarts a dead child process by running `remote_obj_creator` again with the original arguments.
+
+`proxy_context` selects the start method of the child processes. With `proxy_context="forkserver"` and `proxy_preload=[...]`, the child processes are forked from a server process with the heavy modules already imported, so starting dozens of child processes from a large parent is fast and does not inherit the parent's memory. See `examples/benchmark_start_method.py` for the start up latency of each method.
+
+For scaling experiments, `proxy_cpu_affinity` and `proxy_numa_node` pin a child process to some CPUs, and the `proxy_placement` of `RemoteObjectPool` ("compact" or "scatter") pins every worker to its own CPU, so the OS does not migrate the workers around. `get_cpu_affinity()` reports the CPUs a remote object is pinned to.
+
+With `proxy_stats=True`, the proxies and pools record the number of calls, the pickling time, the message sizes, the queueing time and the execution time of every method as histograms, see `get_stats()`. With `proxy_trace=True`, the calls are recorded as Chrome trace events too, `export_trace(file_path)` writes them for `chrome://tracing` or Perfetto.
+
+A method returning a generator is streamed: the generator stays in the child process and the call returns a `RemoteIterator` (an `AsyncRemoteIterator` for `async for` on the asyncio proxy), which pulls the items in chunks of `proxy_stream_chunksize` with one chunk requested ahead, so millions of records can be produced without holding them all on either side.
+
+With `proxy_shared_memory_threshold`, buffers larger than the threshold in arguments and return values (`bytes`, `bytearray`, NumPy arrays and other objects supporting pickle protocol 5) are passed through `multiprocessing.shared_memory` segments owned by the proxy, and only their handles go through the pipe. See `examples/benchmark_shared_memory.py` for a comparison with the pipe.
+
+The options of the proxies and the pool start with `proxy_` (`proxy_num_of_threads`, `proxy_context`, `proxy_stats`, ...), so they never take the keyword arguments meant for `remote_obj_creator`: every other keyword argument is passed to `remote_obj_creator`, the same as before the options were added.
+
+The `AsyncRemoteObjectProxy` is the asyncio front end, its method calls return awaitables. The pipe of the child process is registered to the running event loop, so many remote objects can be awaited at once without blocking the loop.
 
 ## Example
 
 ```python
-from Kkit.child_process import RemoteObjectProxy, ParallelResultFetcher
+from Kkit.child_process import RemoteObjectProxy, RemoteObjectPool, AsyncRemoteObjectProxy, ParallelResultFetcher
+import asyncio
 import time
 
 class TestObj:
@@ -52,12 +77,58 @@ for i in range(num_processes):
 res = result_fetcher.wait_all_results()
 print(res)
 print(time.time()-start_time)  # should be around 11 seconds(last object sleep the longest time, 9+2 seconds)
+
+# Pooled execution
+
+pool = RemoteObjectPool(obj_creator, num_of_workers=4, time=1)
+result_fetcher = ParallelResultFetcher(8)
+for i in range(8):
+    result_fetcher[i] = pool.sleep(0)  # dispatched to an idle replica
+print(result_fetcher.wait_all_results())  # should take around 2 seconds(8 calls on 4 replicas)
+pool.close()
+
+# asyncio
+
+async def main():
+    objs = [await AsyncRemoteObjectProxy.create(obj_creator, time=1) for _ in range(10)]
+    print(await asyncio.gather(*[obj.sleep(1) for obj in objs]))  # should take around 2 seconds
+    for obj in objs:
+        obj.close()
+
+asyncio.run(main())
 ```
 """
 
-import copy
+import io
+import os
+import json
+import pickle
+import asyncio
+import time
+import types
+import inspect
+import itertools
+import collections
+import threading
+import concurrent.futures
 import multiprocessing
+import multiprocessing.connection
+from multiprocessing.reduction import ForkingPickler
+try:
+    from multiprocessing import shared_memory, resource_tracker
+except ImportError:  # python < 3.8
+    shared_memory = None
 
+FIRST_COMPLETED = concurrent.futures.FIRST_COMPLETED
+"""Return from `ParallelResultFetcher.wait` when any result arrives."""
+ALL_COMPLETED = concurrent.futures.ALL_COMPLETED
+"""Return from `ParallelResultFetcher.wait` when all results arrive."""
+
+class RemoteProcessError(Exception):
+    """
+    Raised when the child process of a remote object dies (e.g. killed by OOM or crashed in a C extension).
+    """
+    pass
 
 class EmptyResult:
     """
@@ -105,17 +176,773 @@ class ParallelResultFetcher:
     def __len__(self):
         return len(self.results)
 
+    def _running(self):
+        """@private
+        The indexes of the slots whose `RemoteFuture` is not received yet.
+        """
+        return [i for i, result in enumerate(self.results) if isinstance(result, RemoteFuture)]
+
+    def _poll(self, indexes, timeout):
+        """@private
+        Wait until the child process of at least one slot in `indexes` replies, return the indexes of finished slots and store their results in place.
+        """
+        futures = {self.results[i]: i for i in indexes}
+        finished, _ = concurrent.futures.wait(futures, timeout, FIRST_COMPLETED)
+        done = sorted(futures[future] for future in finished)
+        for i in done:
+            self.results[i] = self.results[i].recv()
+        return done
+
+    def as_completed(self, timeout=None):
+        """
+        Yield `(index, result)` for every slot as soon as its result arrives, in the order they finish.
+
+        The result is the return value, or the Exception raised in child process. It is moved out of the fetcher, the slot is reset to `EmptyResult`.
+        Slots that hold a normal value instead of a `RemoteFuture` are yielded first.
+
+        Parameters
+        ----------
+        timeout : float, optional
+            The maximum number of seconds to wait for all results. Default is None, no limit.
+            `concurrent.futures.TimeoutError` is raised if some results do not arrive in time.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for i, result in enumerate(self.results):
+            if not isinstance(result, (RemoteFuture, EmptyResult)):
+                self.results[i] = EmptyResult()
+                yield i, result
+        running = self._running()
+        while running:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                raise concurrent.futures.TimeoutError(f"{len(running)} results are not finished")
+            for i in self._poll(running, remaining):
+                result, self.results[i] = self.results[i], EmptyResult()
+                yield i, result
+            running = self._running()
+
+    def wait(self, timeout=None, return_when=ALL_COMPLETED):
+        """
+        Wait for the results, the received results are stored in place and can be read by `fetcher[index]`.
+
+        Parameters
+        ----------
+        timeout : float, optional
+            The maximum number of seconds to wait. Default is None, no limit.
+
+        return_when : str, optional
+            `ALL_COMPLETED` (default) to wait for all results, or `FIRST_COMPLETED` to return as soon as any result arrives.
+
+        Returns
+        -------
+        (set, set)
+            The indexes of the slots that are finished and not finished.
+        """
+        if return_when not in (FIRST_COMPLETED, ALL_COMPLETED):
+            raise ValueError(f"return_when should be FIRST_COMPLETED or ALL_COMPLETED, got {return_when}")
+        deadline = None if timeout is None else time.monotonic() + timeout
+        running = self._running()
+        while running:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                break
+            if self._poll(running, remaining) and return_when == FIRST_COMPLETED:
+                break
+            running = self._running()
+        running = set(self._running())
+        return set(range(self.num_of_processes)) - running, running
+
     def wait_all_results(self):
         """
         Wait for all results and return the results. After calling this function, the `ParallelResultFetcher.results` will be reset to `EmptyResult`.
+
+        The results are received in the order they finish, and the list is handed over without copying.
         """
-        for i in range(self.num_of_processes):
-            self.results[i] = self.results[i].recv()
+        self.wait()
+        res = self.results
+        self.results = [EmptyResult()] * self.num_of_processes
+        return res
+
+class _PipeTransport:
+    """@private
+    Send the messages through the pipe directly.
+
+    `dumps` and `loads` are separated from `send` and `recv`, so the pickling time and the message size can be measured.
+    """
+    def dumps(self, obj):
+        return ForkingPickler.dumps(obj)
+
+    def loads(self, payload):
+        return ForkingPickler.loads(payload)
+
+    def send(self, conn, obj):
+        conn.send_bytes(self.dumps(obj))
+
+    def recv(self, conn):
+        return self.loads(conn.recv_bytes())
+
+    def close(self):
+        pass
+
+class _SharedMemoryPickler(pickle.Pickler):
+    """@private
+    Pickle `bytes` and `bytearray` larger than the threshold as out-of-band buffers too, like NumPy arrays.
+    """
+    def __init__(self, file, threshold, buffer_callback):
+        super().__init__(file, protocol=5, buffer_callback=buffer_callback)
+        self.threshold = threshold
+
+    def reducer_override(self, obj):
+        if type(obj) in (bytes, bytearray) and len(obj) >= self.threshold:
+            return type(obj), (pickle.PickleBuffer(obj),)
+        return NotImplemented
 
-        res = copy.deepcopy(self.results)
-        self.results = [None] * self.num_of_processes
+class _SharedMemoryTransport(_PipeTransport):
+    """@private
+    Pickle the messages with protocol 5, the out-of-band buffers larger than `threshold` are put into shared memory segments and only their handles are sent through the pipe.
+
+    The segments are created, reused and unlinked by the sender. The first byte of a segment tells whether it is in flight or free to be reused (the receiver has taken the buffer out). Reusing the segments avoids paying the page faults of fresh memory for every message.
+    """
+    HEADER = 64
+    FREE, IN_FLIGHT = 0, 1
+
+    def __init__(self, threshold):
+        if shared_memory is None:
+            raise RuntimeError("shared memory transport needs python 3.8 or later")
+        self.threshold = max(int(threshold), 1)
+        self._segments = []   # created by this side
+        self._attached = {}   # created by the other side
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        return {"threshold": self.threshold}
+
+    def __setstate__(self, state):
+        self.__init__(state["threshold"])
+
+    def _acquire_segment(self, size):
+        with self._lock:
+            best = None
+            for segment in self._segments:
+                if segment.buf[0] == self.FREE and segment.size - self.HEADER >= size:
+                    if best is None or segment.size < best.size:
+                        best = segment
+            if best is None:
+                capacity = 1 << (size - 1).bit_length()
+                best = shared_memory.SharedMemory(create=True, size=self.HEADER + capacity)
+                self._segments.append(best)
+            best.buf[0] = self.IN_FLIGHT
+            return best
+
+    def dumps(self, obj):
+        buffers = []
+        data = io.BytesIO()
+        _SharedMemoryPickler(data, self.threshold, buffers.append).dump(obj)
+        handles = []
+        for buffer in buffers:
+            with buffer.raw() as raw:
+                if raw.nbytes >= self.threshold:
+                    segment = self._acquire_segment(raw.nbytes)
+                    segment.buf[self.HEADER:self.HEADER + raw.nbytes] = raw
+                    handles.append((segment.name, raw.nbytes))
+                else:
+                    handles.append(raw.tobytes())
+        return ForkingPickler.dumps((data.getvalue(), handles))
+
+    def loads(self, payload):
+        data, handles = ForkingPickler.loads(payload)
+        segments = []
+        views = []
+        buffers = []
+        for handle in handles:
+            if isinstance(handle, tuple):
+                name, size = handle
+                segment = self._attached.get(name)
+                if segment is None:
+                    segment = self._attached[name] = shared_memory.SharedMemory(name=name)
+                view = segment.buf[self.HEADER:self.HEADER + size]
+                segments.append(segment)
+                views.append(view)
+                # the views exported through the PickleBuffer are counted on `view`
+                buffers.append(pickle.PickleBuffer(view))
+            else:
+                buffers.append(handle)
+        # `bytes` and `bytearray` copy the buffer out of the segment when they are rebuilt
+        obj = pickle.loads(data, buffers=buffers)
+        if not self._release(buffers, views):
+            # the object refers to the segments (e.g. NumPy arrays), rebuild it from private copies
+            del obj
+            buffers = [bytearray(view) for view in views]
+            self._release((), views)
+            copies = iter(buffers)
+            obj = pickle.loads(data, buffers=[next(copies) if isinstance(handle, tuple) else handle for handle in handles])
+        for segment in segments:
+            segment.buf[0] = self.FREE
+        return obj
+
+    @staticmethod
+    def _release(buffers, views):
+        for buffer in buffers:
+            if isinstance(buffer, pickle.PickleBuffer):
+                buffer.release()
+        released = True
+        for view in views:
+            try:
+                view.release()
+            except BufferError:
+                released = False
+        return released
+
+    def close(self):
+        with self._lock:
+            for segment in self._segments:
+                segment.close()
+                try:
+                    segment.unlink()
+                except FileNotFoundError:
+                    pass
+            self._segments = []
+        for segment in self._attached.values():
+            segment.close()
+        self._attached = {}
+
+class _Histogram:
+    """@private
+    A histogram with power of two buckets, for durations in seconds (bucketed by microseconds) or sizes in bytes.
+    """
+    def __init__(self, scale):
+        self.scale = scale
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+        self.buckets = {}
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        upper = 1 << int(value * self.scale).bit_length()
+        self.buckets[upper] = self.buckets.get(upper, 0) + 1
+
+    def merge(self, other):
+        for upper, count in other.buckets.items():
+            self.buckets[upper] = self.buckets.get(upper, 0) + count
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "total": self.total,
+            "mean": self.total / self.count if self.count else None,
+            "min": self.min,
+            "max": self.max,
+            "buckets": dict(sorted(self.buckets.items())),
+        }
+
+class _MethodStats:
+    """@private
+    The statistics of the calls of one method.
+    """
+    DURATIONS = ("serialize", "queue", "execute", "deserialize", "total")
+    SIZES = ("request_bytes", "reply_bytes")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.histograms = {name: _Histogram(1e6) for name in self.DURATIONS}
+        self.histograms.update({name: _Histogram(1) for name in self.SIZES})
+
+    def merge(self, other):
+        self.calls += other.calls
+        self.errors += other.errors
+        for name, histogram in other.histograms.items():
+            self.histograms[name].merge(histogram)
+
+    def to_dict(self):
+        res = {"calls": self.calls, "errors": self.errors}
+        res.update({name: histogram.to_dict() for name, histogram in self.histograms.items()})
         return res
 
+class _CallStats:
+    """@private
+    Record the time and the message size of every call of a proxy, and the trace events if `trace` is True.
+
+    The timestamps come from `time.perf_counter`, which is the system wide monotonic clock on Linux, so the timestamps taken in the child process are comparable.
+    """
+    def __init__(self, trace):
+        self._lock = threading.Lock()
+        self._sent = {}
+        self.methods = {}
+        self.events = [] if trace else None
+
+    def sent(self, request_id, op, name, start, dumped, nbytes):
+        key = name if op == "call" else op if name is None else f"{op}:{name}"
+        with self._lock:
+            self._sent[request_id] = (key, start, dumped, time.perf_counter(), nbytes)
+
+    def received(self, request_id, ok, span, start, loaded, nbytes, pid):
+        with self._lock:
+            sent = self._sent.pop(request_id, None)
+            if sent is None:
+                return
+            key, sent_start, dumped, sent_end, request_bytes = sent
+            stats = self.methods.get(key)
+            if stats is None:
+                stats = self.methods[key] = _MethodStats()
+            stats.calls += 1
+            stats.errors += not ok
+            stats.histograms["serialize"].add(dumped - sent_start)
+            stats.histograms["deserialize"].add(loaded - start)
+            stats.histograms["total"].add(loaded - sent_start)
+            stats.histograms["request_bytes"].add(request_bytes)
+            stats.histograms["reply_bytes"].add(nbytes)
+            if span is not None:
+                stats.histograms["queue"].add(max(span[0] - sent_end, 0))
+                stats.histograms["execute"].add(span[1] - span[0])
+            if self.events is not None:
+                parent = {"pid": os.getpid(), "tid": threading.get_ident(), "cat": "remote"}
+                self.events.append(dict(parent, name=f"serialize {key}", ph="X", ts=sent_start * 1e6, dur=(dumped - sent_start) * 1e6,
+                                        args={"request_id": request_id, "bytes": request_bytes}))
+                if span is not None:
+                    self.events.append({"pid": pid, "tid": 0, "cat": "remote", "name": key, "ph": "X", "ts": span[0] * 1e6,
+                                        "dur": (span[1] - span[0]) * 1e6, "args": {"request_id": request_id, "ok": ok}})
+                self.events.append(dict(parent, name=f"deserialize {key}", ph="X", ts=start * 1e6, dur=(loaded - start) * 1e6,
+                                        args={"request_id": request_id, "bytes": nbytes}))
+
+    def forget(self, request_ids):
+        with self._lock:
+            for request_id in request_ids:
+                self._sent.pop(request_id, None)
+
+    def reset(self):
+        with self._lock:
+            self.methods = {}
+            if self.events is not None:
+                self.events = []
+
+    @staticmethod
+    def merge(stats_list):
+        merged = {}
+        for stats in stats_list:
+            with stats._lock:
+                for key, method_stats in stats.methods.items():
+                    merged.setdefault(key, _MethodStats()).merge(method_stats)
+        return {key: method_stats.to_dict() for key, method_stats in sorted(merged.items())}
+
+    @staticmethod
+    def export_trace(stats_list, file_path):
+        if any(stats.events is None for stats in stats_list):
+            raise RuntimeError("the trace events are not recorded, create the proxy with proxy_trace=True")
+        events = []
+        for stats in stats_list:
+            with stats._lock:
+                events.extend(stats.events)
+        with open(file_path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+def start_forkserver(preload=()):
+    """
+    Start the fork server of `multiprocessing` now, with `preload` modules imported in it.
+
+    The fork server is started by the first child process created with `proxy_context="forkserver"` anyway, call this function to pay the start up cost in advance.
+    The preloaded modules can only be set before the fork server starts.
+
+    Parameters
+    ----------
+    preload : iterable of str, optional
+        The modules to import in the fork server, e.g. ["numpy", "torch"].
+    """
+    _get_context("forkserver", preload)
+    from multiprocessing import forkserver
+    forkserver.ensure_running()
+
+def _get_context(context, preload):
+    """@private"""
+    if context is None:
+        context = multiprocessing.get_context()
+    elif isinstance(context, str):
+        context = multiprocessing.get_context(context)
+    preload = list(preload)
+    if preload:
+        if context.get_start_method() != "forkserver":
+            raise ValueError("preload is only used with the forkserver start method")
+        # __main__ is preloaded by multiprocessing itself
+        context.set_forkserver_preload(["__main__"] + preload)
+    return context
+
+def numa_nodes():
+    """
+    Return the CPUs of every NUMA node as `{node: [cpu, ...]}`, only the CPUs this process is allowed to run on are included.
+
+    On Linux without NUMA information, or on other platforms, all CPUs are regarded as node 0.
+    """
+    if hasattr(os, "sched_getaffinity"):
+        allowed = os.sched_getaffinity(0)
+    else:
+        allowed = set(range(os.cpu_count() or 1))
+    nodes = {}
+    node_root = "/sys/devices/system/node"
+    if os.path.isdir(node_root):
+        for entry in os.listdir(node_root):
+            if not (entry.startswith("node") and entry[4:].isdigit()):
+                continue
+            with open(os.path.join(node_root, entry, "cpulist"), "r") as f:
+                cpus = _parse_cpulist(f.read())
+            cpus = [cpu for cpu in cpus if cpu in allowed]
+            if cpus:
+                nodes[int(entry[4:])] = cpus
+    if not nodes:
+        nodes[0] = sorted(allowed)
+    return dict(sorted(nodes.items()))
+
+def _parse_cpulist(cpulist):
+    """@private
+    Parse the Linux cpulist format, e.g. "0-3,8-11".
+    """
+    cpus = []
+    for part in cpulist.strip().split(","):
+        if not part:
+            continue
+        if "-" in part:
+            start, end = part.split("-")
+            cpus.extend(range(int(start), int(end) + 1))
+        else:
+            cpus.append(int(part))
+    return cpus
+
+def _resolve_cpus(cpu_affinity, numa_node):
+    """@private
+    The CPUs to pin a child process to, None if not pinned.
+    """
+    if cpu_affinity is None and numa_node is None:
+        return None
+    if not hasattr(os, "sched_setaffinity"):
+        raise RuntimeError("cpu_affinity and numa_node are only supported on Linux")
+    cpus = None if cpu_affinity is None else sorted(set(cpu_affinity))
+    if numa_node is not None:
+        nodes = numa_nodes()
+        if numa_node not in nodes:
+            raise ValueError(f"NUMA node {numa_node} does not exist or has no allowed CPU, the nodes are {list(nodes)}")
+        cpus = nodes[numa_node] if cpus is None else [cpu for cpu in cpus if cpu in nodes[numa_node]]
+    if not cpus:
+        raise ValueError("no CPU left to pin the child process to")
+    return cpus
+
+def _place_workers(placement, num_of_workers, cpus):
+    """@private
+    Choose one CPU for every worker by the placement policy.
+    """
+    nodes = [node_cpus if cpus is None else [cpu for cpu in node_cpus if cpu in cpus] for node_cpus in numa_nodes().values()]
+    nodes = [node_cpus for node_cpus in nodes if node_cpus]
+    if not nodes:
+        raise ValueError("no CPU left to pin the worker processes to")
+    if placement == "compact":
+        order = [cpu for node_cpus in nodes for cpu in node_cpus]
+    elif placement == "scatter":
+        order = []
+        for i in range(max(len(node_cpus) for node_cpus in nodes)):
+            order.extend(node_cpus[i] for node_cpus in nodes if i < len(node_cpus))
+    else:
+        raise ValueError(f"placement should be 'compact' or 'scatter', got {placement}")
+    return [order[i % len(order)] for i in range(num_of_workers)]
+
+def _chunks(iterable, chunksize):
+    """@private"""
+    if chunksize <= 0:
+        raise ValueError("chunksize should be larger than 0")
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, chunksize))
+        if not chunk:
+            return
+        yield chunk
+
+def _map_items(func, items, stop_on_error):
+    """@private
+    Call `func` with every item in child process, return `(ok, value)` for every item.
+    """
+    results = []
+    for item in items:
+        try:
+            results.append((True, func(item)))
+        except Exception as e:
+            results.append((False, e))
+            if stop_on_error:
+                break
+    return results
+
+def _collect_map(results, chunk_results, stop_on_error):
+    """@private"""
+    for ok, value in chunk_results:
+        if not ok and stop_on_error:
+            raise value
+        results.append(value)
+
+class _RemoteStream:
+    """@private
+    The reply of a method returning a generator, the generator is kept in the child process and its items are pulled by `RemoteIterator`.
+    """
+    def __init__(self, stream_id, name):
+        self.stream_id = stream_id
+        self.name = name
+
+def _next_chunk(stream, chunksize):
+    """@private
+    Take at most `chunksize` items from the generator, return `(items, finished, exception)`.
+    """
+    generator, lock = stream
+    items = []
+    with lock:
+        try:
+            for item in generator:
+                items.append(item)
+                if len(items) >= chunksize:
+                    return items, False, None
+        except Exception as e:
+            return items, True, e
+    return items, True, None
+
+# the static values of methods, every other descriptor is an attribute
+_METHOD_TYPES = (types.FunctionType, types.BuiltinFunctionType, types.MethodType, types.MethodDescriptorType,
+                 types.WrapperDescriptorType, types.MethodWrapperType, types.ClassMethodDescriptorType, staticmethod, classmethod)
+"""@private"""
+
+def _object_schema(obj, immutable_attrs):
+    """@private
+    Collect the names of callable and non-callable attributes of `obj`, and the values of the immutable ones.
+    """
+    callables = set()
+    attributes = set()
+    for name in dir(obj):
+        if name.startswith("__"):
+            continue
+        try:
+            # classified from the static value, so properties, cached properties and other lazy descriptors are not evaluated
+            try:
+                value = inspect.getattr_static(obj, name)
+            except AttributeError:
+                value = getattr(obj, name)   # provided by __getattr__
+            if isinstance(value, _METHOD_TYPES):
+                callables.add(name)
+            elif hasattr(type(value), "__get__"):
+                attributes.add(name)
+            elif callable(value):
+                callables.add(name)
+            else:
+                attributes.add(name)
+        except Exception:
+            continue
+    immutable = {name: getattr(obj, name) for name in immutable_attrs}
+    cpu_affinity = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else None
+    return {"callables": callables, "attributes": attributes, "immutable": immutable, "cpu_affinity": cpu_affinity}
+
+def _serve_remote_object(remote_obj_creator, args, kwargs, conn, transport, immutable_attrs, num_of_threads, cpus):
+    """@private
+    The main loop of the child process, it is a module level function so that it can be pickled by the spawn and forkserver start methods.
+    """
+    try:
+        if cpus is not None:
+            # pin before the remote object is created, so its memory is allocated on the right NUMA node
+            os.sched_setaffinity(0, cpus)
+        remote_obj = remote_obj_creator(*args, **kwargs)
+        transport.send(conn, _object_schema(remote_obj, immutable_attrs))
+    except Exception as e:
+        transport.send(conn, e)
+        return
+
+    send_lock = threading.Lock()
+    executor = concurrent.futures.ThreadPoolExecutor(num_of_threads) if num_of_threads else None
+    streams = {}
+    stream_ids = itertools.count()
+
+    def reply(request_id, ok, value, span):
+        with send_lock:
+            try:
+                transport.send(conn, (request_id, ok, value, span))
+            except Exception as e:   # the return value can not be pickled
+                transport.send(conn, (request_id, False, e, span))
+
+    def close_stream(stream_id):
+        stream = streams.pop(stream_id, None)
+        if stream is not None:
+            with stream[1]:
+                stream[0].close()
+
+    def execute(request_id, op, name, call_args, call_kwargs):
+        start = time.perf_counter()
+        try:
+            if op == "call":
+                result = getattr(remote_obj, name)(*call_args, **call_kwargs)
+                if inspect.isgenerator(result):
+                    # keep the generator here, the parent pulls its items chunk by chunk
+                    stream_id = next(stream_ids)
+                    streams[stream_id] = (result, threading.Lock())
+                    result = _RemoteStream(stream_id, name)
+            elif op == "next":
+                stream_id, chunksize = call_args
+                stream = streams.get(stream_id)
+                if stream is None:
+                    raise RemoteProcessError(f"the stream of {name} does not exist, the child process may have been restarted")
+                result = _next_chunk(stream, chunksize)
+                if result[1]:
+                    del streams[stream_id]
+            elif op == "map":
+                result = _map_items(getattr(remote_obj, name), *call_args)
+            elif op == "get":
+                result = getattr(remote_obj, name)
+            elif op == "schema":
+                result = _object_schema(remote_obj, immutable_attrs)
+            else:   # "probe", for names that are not in the schema
+                attr = getattr(remote_obj, name)
+                result = RemoteObjectProxy.IsCallable() if callable(attr) else attr
+        except Exception as e:
+            reply(request_id, False, e, (start, time.perf_counter()))
+        else:
+            reply(request_id, True, result, (start, time.perf_counter()))
+
+    while True:
+        try:
+            cmd = transport.recv(conn)
+            if cmd == "close":
+                break
+
+            if cmd[1] == "close_stream":   # no reply
+                if executor is not None:
+                    executor.submit(close_stream, *cmd[3])
+                else:
+                    close_stream(*cmd[3])
+            elif executor is not None and cmd[1] in ("call", "map", "next"):
+                executor.submit(execute, *cmd)
+            else:
+                execute(*cmd)
+        except (EOFError, ConnectionResetError):
+            break
+    if executor is not None:
+        executor.shutdown(wait=True)
+    transport.close()
+
+class RemoteFuture(concurrent.futures.Future):
+    """
+    RemoteFuture is the return value of a method called in parallel mode.
+
+    It is a `concurrent.futures.Future`, call `result()` to get the return value (the Exception raised in child process is raised again), or `recv()` to get the return value or the Exception like the old `multiprocessing.Pipe` interface.
+
+    The replies of the child process are received by a background thread of the proxy as soon as they arrive, so the callbacks of `add_done_callback` run, and `concurrent.futures.wait` and `concurrent.futures.as_completed` work, without waiting on the future.
+    """
+    def recv(self):
+        """
+        Wait for the call to finish and return its return value, or the Exception raised in child process.
+        """
+        exc = self.exception()
+        if exc is not None:
+            return exc
+        return self.result(0)
+
+class RemoteIterator:
+    """
+    RemoteIterator is the return value of a remote method that returns a generator.
+
+    The generator stays in the child process, the items are pulled in chunks of `stream_chunksize` and the next chunk is requested while the current one is consumed.
+    The generator does not run ahead of the next chunk, so a fast producer can not flood the parent process.
+    The Exception raised by the generator is raised again after the items yielded before it.
+
+    The generator is closed in the child process when the iterator is exhausted, closed by `close()`, or garbage collected.
+    """
+    def __init__(self, proxy, stream):
+        self._proxy = proxy
+        """@private"""
+        self._stream = stream
+        """@private"""
+        self._items = collections.deque()
+        """@private"""
+        self._error = None
+        """@private"""
+        self._next = self._request_chunk()
+        """@private"""
+
+    def _request_chunk(self):
+        """@private"""
+        return self._proxy._submit("next", self._stream.name, (self._stream.stream_id, self._proxy._stream_chunksize))
+
+    def _take(self, chunk):
+        """@private
+        Put the items of a chunk into the buffer and request the next chunk before they are consumed.
+        """
+        items, finished, error = chunk
+        self._next = None if finished else self._request_chunk()
+        self._items.extend(items)
+        self._error = error
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        while not self._items:
+            if self._error is not None:
+                error, self._error = self._error, None
+                raise error
+            if self._next is None:
+                raise StopIteration
+            future, self._next = self._next, None
+            try:
+                chunk = self._proxy._result(future)
+            except concurrent.futures.TimeoutError:
+                self._next = future
+                raise
+            self._take(chunk)
+        return self._items.popleft()
+
+    def close(self):
+        """
+        Close the generator in the child process, the items not pulled yet are dropped.
+        """
+        if self._next is not None:
+            self._next = None
+            self._proxy._close_stream(self._stream.stream_id)
+        self._items.clear()
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+class AsyncRemoteIterator(RemoteIterator):
+    """
+    AsyncRemoteIterator is the return value of a remote method of `AsyncRemoteObjectProxy` that returns a generator, iterate it by `async for`.
+    """
+    def __iter__(self):
+        raise TypeError("use async for to iterate an AsyncRemoteIterator")
+
+    def __next__(self):
+        raise TypeError("use async for to iterate an AsyncRemoteIterator")
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        while not self._items:
+            if self._error is not None:
+                error, self._error = self._error, None
+                raise error
+            if self._next is None:
+                raise StopAsyncIteration
+            future, self._next = self._next, None
+            self._take(await future)
+        return self._items.popleft()
+
+    async def aclose(self):
+        """
+        Close the generator in the child process, see `RemoteIterator.close`.
+        """
+        self.close()
+
 class RemoteObjectProxy:
     """
     RemoteObjectProxy is a proxy class for remote object.
@@ -124,10 +951,15 @@ class RemoteObjectProxy:
         def __init__(self):
             pass
 
-    def __init__(self, remote_obj_creator, paralle_execution=True, *args, **kwargs):
+    def __init__(self, remote_obj_creator, paralle_execution=True, *args, proxy_immutable_attrs=(), proxy_num_of_threads=None, proxy_shared_memory_threshold=None, proxy_call_timeout=None, proxy_max_restarts=0, proxy_context=None, proxy_preload=(), proxy_cpu_affinity=None, proxy_numa_node=None, proxy_stats=False, proxy_trace=False, proxy_stream_chunksize=1000, **kwargs):
         """
         This class is a proxy class for remote object.
 
+        The names of the remote object's methods and attributes are fetched once when the remote object is created and cached in the proxy, so a method call costs only one round trip to the child process.
+        Call `refresh_schema` if the remote object gains new attributes later, names that are not in the cache still work but cost one more round trip.
+
+        Every call carries a request ID, so in parallel mode many calls can be in flight on the same proxy, each one returns its own `RemoteFuture`.
+
         Parameters
         ----------
         remote_obj_creator : function
@@ -138,77 +970,459 @@ class RemoteObjectProxy:
 
         *args
             The arguments for `remote_obj_creator`.
+
+        proxy_immutable_attrs : iterable of str, optional
+            The attributes of the remote object that never change after it is created.
+            Their values are fetched together with the schema and read from the proxy without touching the child process.
+
+        proxy_num_of_threads : int, optional
+            The number of threads to run method calls in child process. Default is None, calls are run one by one in the main thread of child process.
+            With threads, the calls of an I/O bound remote object run concurrently without spawning more processes, the remote object should be thread safe.
+
+        proxy_shared_memory_threshold : int, optional
+            The size in bytes above which the buffers in arguments and return values (`bytes`, `bytearray`, NumPy arrays and other objects supporting pickle protocol 5) are passed by shared memory instead of the pipe. Default is None, everything is passed by the pipe.
+            Only a handle of the shared memory segment is sent through the pipe. The segments are owned by the side that creates them and reused once the receiver has taken the buffer out, all of them are unlinked when the proxy is closed.
+            Needs python 3.8 or later.
+
+        proxy_call_timeout : float, optional
+            The maximum number of seconds to wait for a call in sequential mode (and for attribute reads). Default is None, no limit.
+            `concurrent.futures.TimeoutError` is raised if the child process does not reply in time. The child process is regarded as hung and killed, the other calls running in it fail with `RemoteProcessError`, and it is restarted if `proxy_max_restarts` allows.
+
+        proxy_max_restarts : int, optional
+            How many times the child process is restarted if it dies. Default is 0, never restart.
+            The remote object is created again by `remote_obj_creator` with the original arguments, the calls running at that moment fail with `RemoteProcessError`.
+
+        proxy_context : str or multiprocessing context, optional
+            The start method of the child process, "fork", "spawn", "forkserver", or a context returned by `multiprocessing.get_context`. Default is None, the default start method of `multiprocessing`.
+            "fork" copies the whole parent process and is unsafe if the parent has threads, "spawn" and "forkserver" start from a fresh interpreter, `remote_obj_creator` and its arguments should be picklable (e.g. a module level function).
+            "forkserver" forks the child processes from a server process, so starting many child processes from a large parent is fast and does not inherit the parent's memory.
+
+        proxy_preload : iterable of str, optional
+            The modules imported by the fork server before it forks any child process, so they are not imported again in every child process. Only used with `proxy_context="forkserver"`, see `start_forkserver`.
+
+        proxy_cpu_affinity : iterable of int, optional
+            The CPUs the child process is pinned to by `os.sched_setaffinity` (Linux only). Default is None, not pinned.
+
+        proxy_numa_node : int, optional
+            Pin the child process to the CPUs of this NUMA node (Linux only), combined with `proxy_cpu_affinity` if both are given. Default is None.
+            `get_cpu_affinity` reports the CPUs the child process is actually pinned to.
+
+        proxy_stats : bool, optional
+            Whether to record the statistics of every call, see `get_stats`. Default is False.
+
+        proxy_trace : bool, optional
+            Whether to record every call as Chrome trace events too, see `export_trace`. Default is False. The events are kept in memory until `reset_stats` is called.
+
+        proxy_stream_chunksize : int, optional
+            The number of items pulled at once from a remote generator. Default is 1000.
+            If a method returns a generator, the generator stays in the child process and the call returns a `RemoteIterator`, which pulls the items chunk by chunk, so neither side holds all of them.
             
         **kwargs
-            The keyword arguments for `remote_obj_creator
+            The keyword arguments for `remote_obj_creator`, every keyword argument except the `proxy_` options above.
+        """
+        self._start(remote_obj_creator, paralle_execution, args, kwargs, immutable_attrs=proxy_immutable_attrs, num_of_threads=proxy_num_of_threads,
+                    shared_memory_threshold=proxy_shared_memory_threshold, call_timeout=proxy_call_timeout, max_restarts=proxy_max_restarts,
+                    context=proxy_context, preload=proxy_preload, cpu_affinity=proxy_cpu_affinity, numa_node=proxy_numa_node, stats=proxy_stats, trace=proxy_trace, stream_chunksize=proxy_stream_chunksize)
+        self._wait_ready()
+        self._start_receiver()
+
+    @classmethod
+    def _spawn(cls, remote_obj_creator, paralle_execution, args, kwargs, **options):
+        """@private
+        Start the child process without waiting for the remote object to be created.
         """
+        proxy = cls.__new__(cls)
+        proxy._start(remote_obj_creator, paralle_execution, args, kwargs, **options)
+        return proxy
+
+    def _start(self, remote_obj_creator, paralle_execution, args, kwargs, immutable_attrs=(), num_of_threads=None, shared_memory_threshold=None,
+               call_timeout=None, max_restarts=0, context=None, preload=(), cpu_affinity=None, numa_node=None, stats=False, trace=False, stream_chunksize=1000):
         self.paralle_execution = paralle_execution
         """@private"""
-        self.parent_conn, child_conn = multiprocessing.Pipe()
+        self.remote_obj_creator = remote_obj_creator
         """@private"""
-
         self.args = args
         """@private"""
         self.kwargs = kwargs
         """@private"""
+        self._schema = None
+        """@private"""
+        self._request_ids = itertools.count()
+        """@private"""
+        self._pending = {}
+        """@private"""
+        self._send_lock = threading.Lock()
+        """@private"""
+        self._recv_lock = threading.Lock()
+        """@private"""
+        self._receiver = None
+        """@private"""
+        self._on_reply = None
+        """@private"""
+        self._immutable_attrs = tuple(immutable_attrs)
+        """@private"""
+        self._num_of_threads = num_of_threads
+        """@private"""
+        self._call_timeout = call_timeout
+        """@private"""
+        self._restarts_left = max_restarts
+        """@private"""
+        self._dead = None
+        """@private"""
+        self._context = _get_context(context, preload)
+        """@private"""
+        self._cpus = _resolve_cpus(cpu_affinity, numa_node)
+        """@private"""
+        self._stats = _CallStats(trace) if stats or trace else None
+        """@private"""
+        self._stream_chunksize = stream_chunksize
+        """@private"""
+        self._closed_streams = collections.deque()
+        """@private"""
+        if shared_memory_threshold is None:
+            self._transport = _PipeTransport()
+            """@private"""
+        else:
+            self._transport = _SharedMemoryTransport(shared_memory_threshold)
+            # share one resource tracker with the child process, so the segments are tracked by the same process
+            resource_tracker.ensure_running()
+        self._launch()
 
-        self.process = multiprocessing.Process(
-            target=self._run_remote_object,
-            args=(remote_obj_creator, child_conn),
+    def _launch(self):
+        """@private
+        Start the child process.
+        """
+        self.parent_conn, child_conn = multiprocessing.Pipe()
+        """@private"""
+        self.process = self._context.Process(
+            target=_serve_remote_object,
+            args=(self.remote_obj_creator, self.args, self.kwargs, child_conn, self._transport, self._immutable_attrs, self._num_of_threads, self._cpus),
             daemon=True
         )
         """@private"""
         self.process.start()
-        self.parent_conn.recv()  # wait for the remote object to be created
+        child_conn.close()   # so the parent sees EOF when the child process dies
 
-    def _run_remote_object(self, remote_obj_creator, conn):
-        remote_obj = remote_obj_creator(*self.args, **self.kwargs)
-        conn.send("ready")
-        while True:
+    def _wait_ready(self):
+        # wait for the remote object to be created, or the child process to die
+        multiprocessing.connection.wait([self.parent_conn, self.process.sentinel])
+        try:
+            res = self._transport.recv(self.parent_conn)
+        except (EOFError, ConnectionError):
+            self.process.join()
+            raise RemoteProcessError(f"the child process exited with code {self.process.exitcode} before the remote object was created")
+        if isinstance(res, Exception):
+            raise res
+        self._schema = res
+
+    def _submit(self, op, name, args=(), kwargs=None):
+        """@private
+        Send one command to the child process and return the `RemoteFuture` of its reply.
+        """
+        if self._dead is not None:
+            raise self._dead
+        future = self._new_future()
+        with self._send_lock:
+            self._flush_closed_streams()
+            conn = self.parent_conn
+            request_id = next(self._request_ids)
+            self._pending[request_id] = future
+            try:
+                if self._stats is None:
+                    self._transport.send(conn, (request_id, op, name, args, kwargs or {}))
+                else:
+                    start = time.perf_counter()
+                    payload = self._transport.dumps((request_id, op, name, args, kwargs or {}))
+                    dumped = time.perf_counter()
+                    # record before sending, the reply may be received by another thread before send_bytes returns
+                    self._stats.sent(request_id, op, name, start, dumped, len(payload))
+                    conn.send_bytes(payload)
+                return future
+            except OSError:   # also the pipe closed by the receiver thread while restarting the child process
+                del self._pending[request_id]
+                if self._stats is not None:
+                    self._stats.forget([request_id])
+        # the child process is dead, restart it (if allowed) and send again
+        with self._recv_lock:
+            if self.parent_conn is conn:
+                self.process.kill()
+                self._child_died()
+        return self._submit(op, name, args, kwargs)
+
+    def _close_stream(self, stream_id):
+        """@private
+        Ask the child process to close a remote generator. It may be called by the garbage collector while the send lock is held, so the command is sent later if the lock is taken.
+        """
+        self._closed_streams.append(stream_id)
+        if self._send_lock.acquire(blocking=False):
             try:
-                cmd = conn.recv()
-                if cmd == "close":
-                    break
+                self._flush_closed_streams()
+            finally:
+                self._send_lock.release()
+
+    def _flush_closed_streams(self):
+        """@private
+        Send the "close_stream" commands, the send lock should be held. There is no reply to them.
+        """
+        while self._closed_streams:
+            stream_id = self._closed_streams.popleft()
+            if self._dead is not None or self.parent_conn.closed:
+                continue
+            try:
+                self._transport.send(self.parent_conn, (None, "close_stream", None, (stream_id,), {}))
+            except ConnectionError:
+                pass
+
+    def _iterator(self, stream):
+        """@private"""
+        return RemoteIterator(self, stream)
+
+    def _new_future(self):
+        """@private"""
+        future = RemoteFuture()
+        future.set_running_or_notify_cancel()   # a sent command can not be cancelled
+        if self._on_reply is not None:
+            future.add_done_callback(self._on_reply)
+        return future
 
-                func_name, not_test, args, kwargs = cmd
+    def _request(self, op, name, args=(), kwargs=None):
+        """@private
+        Send one command to the child process and wait for the reply, the Exception is returned instead of raised.
+        """
+        future = self._submit(op, name, args, kwargs)
+        self._wait(future)
+        return future.recv()
+
+    def _wait(self, future):
+        """@private
+        Wait until a call is finished, at most `call_timeout` seconds.
+        A child process that does not reply in time is regarded as hung: it is killed, so all its running calls fail with `RemoteProcessError`, and restarted if `max_restarts` allows, then `concurrent.futures.TimeoutError` is raised.
+        """
+        try:
+            future.exception(self._call_timeout)
+        except concurrent.futures.TimeoutError:
+            with self._recv_lock:
+                hung = not future.done() and self._dead is None
+                if hung:
+                    self.process.kill()
+                    self._child_died()
+            if hung or not future.done():
+                raise
+
+    def _result(self, future):
+        """@private
+        Wait until a call is finished, see `_wait`, and return its return value.
+        """
+        self._wait(future)
+        return future.result()
+
+    def _dispatch(self, reply):
+        """@private"""
+        request_id, ok, value, _ = reply
+        if ok and isinstance(value, _RemoteStream):
+            value = self._iterator(value)
+        self._set_future(self._pending.pop(request_id), ok, value)
+
+    def _set_future(self, future, ok, value):
+        """@private"""
+        if ok:
+            future.set_result(value)
+        else:
+            future.set_exception(value)
+
+    def _receive_one(self):
+        """@private
+        Receive one reply, the receive lock should be held and the pipe should be readable.
+        """
+        try:
+            if self._stats is None:
+                reply = self._transport.recv(self.parent_conn)
+            else:
+                payload = self.parent_conn.recv_bytes()
+                start = time.perf_counter()
+                reply = self._transport.loads(payload)
+                self._stats.received(reply[0], reply[1], reply[3], start, time.perf_counter(), len(payload), self.process.pid)
+        except (EOFError, ConnectionError):
+            self._child_died()
+        else:
+            self._dispatch(reply)
+
+    def _child_died(self):
+        """@private
+        Fail the running calls of the dead child process and restart it if allowed, the receive lock should be held.
+        """
+        self.process.join()
+        error = RemoteProcessError(f"the child process exited with code {self.process.exitcode}")
+        with self._send_lock:
+            pending, self._pending = self._pending, {}
+            self.parent_conn.close()
+            self._transport.close()
+        if self._stats is not None:
+            self._stats.forget(pending)
+        if self._restarts_left <= 0:
+            self._dead = error   # before the futures are failed, so their callbacks see the dead proxy
+        for future in pending.values():
+            self._set_future(future, False, error)
+        if self._dead is None:
+            self._restarts_left -= 1
+            self._launch()
+            self._wait_ready()
+
+    def _start_receiver(self):
+        """@private
+        Start the thread receiving the replies, after the remote object is created.
+        """
+        self._receiver = threading.Thread(target=self._receive_replies, name="RemoteObjectProxy-receiver", daemon=True)
+        self._receiver.start()
+
+    def _receive_replies(self):
+        """@private
+        Resolve the futures as the replies arrive, restart the child process (if allowed) when it dies, until the proxy is closed or dead.
+        """
+        while True:
+            with self._recv_lock:
+                if self._dead is not None:
+                    return
+                conn, sentinel = self.parent_conn, self.process.sentinel
+            try:
+                multiprocessing.connection.wait([conn, sentinel])
+            except (OSError, ValueError):
+                pass   # the pipe is closed by another thread
+            with self._recv_lock:
+                if self._dead is not None:
+                    return
+                if conn is not self.parent_conn or conn.closed:
+                    continue   # the child process has been restarted by another thread
                 try:
-                    attr = getattr(remote_obj, func_name)
-                    if not callable(attr):
-                        result = getattr(remote_obj, func_name)
-                        conn.send(result)
-                    else:
-                        if not_test:
-                            result = getattr(remote_obj, func_name)(*args, **kwargs)
-                            conn.send(result)
-                        else:
-                            is_callable = self.IsCallable()
-                            conn.send(is_callable)
+                    if conn.poll():
+                        self._receive_one()
+                    elif not self.process.is_alive():
+                        self._child_died()
                 except Exception as e:
-                    conn.send(e)
-            except (EOFError, ConnectionResetError):
-                break
+                    self._dead = e   # the child process can not be restarted
+                    return
+
+    def map(self, method, iterable, chunksize=1000):
+        """
+        Call `method` of the remote object with every item of `iterable` as the argument, and return the list of return values.
+
+        The calls are sent in chunks of `chunksize` items, every chunk costs one message and its results come back in one reply, so chatty workloads are not dominated by the per-message overhead.
+        In parallel mode the next chunk is sent before the results of the current one arrive, in sequential mode it is sent after the current one succeeds, so no item after a failed one is run.
+
+        The Exception semantics are the same as calling the method item by item: in sequential mode the Exception of the first failed item is raised (the rest of its chunk is not run), in parallel mode the Exception is put into the list in place of the return value.
+
+        Parameters
+        ----------
+        method : str
+            The name of the method.
+
+        iterable : iterable
+            The arguments, one item for one call.
+
+        chunksize : int, optional
+            The number of calls in one message. Default is 1000.
+
+        Returns
+        -------
+        list
+            The return values in the order of `iterable`.
+        """
+        stop_on_error = not self.paralle_execution
+        # one chunk ahead in parallel mode, none in sequential mode
+        depth = 1 if stop_on_error else 2
+        results = []
+        in_flight = collections.deque()
+        for chunk in _chunks(iterable, chunksize):
+            if len(in_flight) >= depth:
+                _collect_map(results, self._result(in_flight.popleft()), stop_on_error)
+            in_flight.append(self._submit("map", method, (chunk, stop_on_error)))
+        while in_flight:
+            _collect_map(results, self._result(in_flight.popleft()), stop_on_error)
+        return results
+
+    def get_cpu_affinity(self):
+        """
+        Return the sorted list of CPUs the child process is pinned to, or None if the platform can not tell.
+        """
+        return self._schema["cpu_affinity"]
+
+    def get_stats(self):
+        """
+        Return the statistics of the finished calls, the proxy should be created with `proxy_stats=True`.
+
+        The keys are the method names (`"map:<method>"` for `map`, `"get:<attribute>"` for attribute reads), every value is a dict with the number of `calls` and `errors`, and the histograms:
+
+        - `serialize`: pickling the command in the parent process.
+        - `queue`: from the command being sent to the child process starting to run it.
+        - `execute`: running the method in the child process.
+        - `deserialize`: unpickling the reply in the parent process.
+        - `total`: from the call being made to its reply being unpickled.
+        - `request_bytes` and `reply_bytes`: the size of the messages, the buffers passed by shared memory are not counted.
+
+        A histogram is a dict of `count`, `total`, `mean`, `min`, `max` (seconds or bytes) and `buckets`, which maps the upper bound of a power of two bucket (microseconds or bytes, exclusive) to the number of values in it.
+
+        Returns
+        -------
+        dict
+            The statistics of every method.
+        """
+        if self._stats is None:
+            raise RuntimeError("the statistics are not recorded, create the proxy with proxy_stats=True")
+        return _CallStats.merge([self._stats])
+
+    def reset_stats(self):
+        """
+        Clear the statistics and the trace events recorded so far.
+        """
+        if self._stats is not None:
+            self._stats.reset()
+
+    def export_trace(self, file_path):
+        """
+        Write the calls recorded so far to `file_path` in the Chrome trace event format, which can be opened by `chrome://tracing` or Perfetto.
+        The proxy should be created with `proxy_trace=True`.
+
+        Serializing and deserializing are shown on the threads of the parent process, and executing on the child process.
+        """
+        if self._stats is None:
+            raise RuntimeError("the trace events are not recorded, create the proxy with proxy_trace=True")
+        _CallStats.export_trace([self._stats], file_path)
+
+    def refresh_schema(self):
+        """
+        Fetch the names of the remote object's methods and attributes (and the values of the immutable attributes) again.
+        """
+        res = self._request("schema", None)
+        if isinstance(res, Exception):
+            raise res
+        self._schema = res
 
     def __getattr__(self, name):
+        schema = self.__dict__.get("_schema")
+        if name.startswith("__") or schema is None:
+            raise AttributeError(name)
+
         def dynamic_call(*args, **kwargs):
-            self.parent_conn.send((name, True, args, kwargs))
-            
-            result = self.parent_conn.recv()
-            if isinstance(result, Exception):
-                raise result
-            return result
+            return self._result(self._submit("call", name, args, kwargs))
         
         def dynamic_call_parallel(*args, **kwargs):
-            self.parent_conn.send((name, True, args, kwargs))
-            return self.parent_conn
+            return self._submit("call", name, args, kwargs)
 
-        self.parent_conn.send((name, False, (), {}))
-        res = self.parent_conn.recv()
+        if name in schema["immutable"]:
+            return schema["immutable"][name]
+        if name in schema["callables"]:
+            return dynamic_call_parallel if self.paralle_execution else dynamic_call
+        if name in schema["attributes"]:
+            res = self._request("get", name)
+        else:
+            res = self._request("probe", name)
         if isinstance(res, Exception):
             if self.paralle_execution:
                 return res
             else:
                 raise res
         if isinstance(res, self.IsCallable):
+            schema["callables"].add(name)
             if self.paralle_execution:
                 return dynamic_call_parallel
             else:
@@ -217,7 +1431,490 @@ class RemoteObjectProxy:
             return res
 
     def close(self):
+        self._restarts_left = 0
         if self.process.is_alive():
-            self.parent_conn.send("close")
+            with self._send_lock:
+                try:
+                    self._transport.send(self.parent_conn, "close")
+                except ConnectionError:
+                    pass
             self.process.join()
-        self.parent_conn.close()
\ No newline at end of file
+        if self._receiver is not None:
+            # the receiver thread takes the replies of the calls sent before "close", and exits when the pipe is closed
+            self._receiver.join()
+        with self._recv_lock:
+            # the calls sent before "close" are finished, receive their replies
+            while self._pending and not self.parent_conn.closed and self.parent_conn.poll():
+                self._receive_one()
+            if self._pending:
+                self._child_died()
+        self._dead = RemoteProcessError("the remote object is closed")
+        self.parent_conn.close()
+        self._transport.close()
+
+class AsyncRemoteObjectProxy(RemoteObjectProxy):
+    """
+    AsyncRemoteObjectProxy is a proxy class for remote object, used in asyncio.
+    """
+    def __init__(self, remote_obj_creator, *args, proxy_immutable_attrs=(), proxy_num_of_threads=None, proxy_shared_memory_threshold=None, proxy_call_timeout=None, proxy_max_restarts=0, proxy_context=None, proxy_preload=(), proxy_cpu_affinity=None, proxy_numa_node=None, proxy_stats=False, proxy_trace=False, proxy_stream_chunksize=1000, **kwargs):
+        """
+        This class is a proxy class for remote object whose method calls return awaitables.
+
+        The pipe of the child process is registered to the running event loop by `loop.add_reader`, replies are received when they arrive, so hundreds of remote objects can be awaited at once without a thread per call.
+        It needs an event loop supporting `add_reader` (the default loop on Unix).
+
+        The constructor blocks until the remote object is created, use `await AsyncRemoteObjectProxy.create(...)` inside a running event loop instead.
+
+        - `await proxy.method(*args, **kwargs)` calls a method, the Exception raised in child process is raised again.
+        - `await proxy.attribute` reads an attribute, attributes in `proxy_immutable_attrs` are read without `await`.
+        - `await proxy.map(method, iterable, chunksize)` calls a method with every item of `iterable` in chunks.
+        - `await proxy.refresh_schema()` fetches the schema again.
+
+        Parameters
+        ----------
+        remote_obj_creator : function
+            A function to create the remote object, this function should return the object to be controlled in child process.
+
+        *args
+            The arguments for `remote_obj_creator`.
+
+        proxy_immutable_attrs : iterable of str, optional
+            The attributes of the remote object that never change after it is created, see `RemoteObjectProxy`.
+
+        proxy_num_of_threads : int, optional
+            The number of threads to run method calls in child process, see `RemoteObjectProxy`.
+
+        proxy_shared_memory_threshold : int, optional
+            The size in bytes above which buffers are passed by shared memory, see `RemoteObjectProxy`.
+
+        proxy_call_timeout : float, optional
+            Not used, use `asyncio.wait_for` to limit the time of a call.
+
+        proxy_max_restarts : int, optional
+            How many times the child process is restarted if it dies, see `RemoteObjectProxy`.
+            The restart blocks the event loop until the remote object is created again.
+
+        proxy_context : str or multiprocessing context, optional
+            The start method of the child process, see `RemoteObjectProxy`.
+
+        proxy_preload : iterable of str, optional
+            The modules imported by the fork server, see `RemoteObjectProxy`.
+
+        proxy_cpu_affinity : iterable of int, optional
+            The CPUs the child process is pinned to, see `RemoteObjectProxy`.
+
+        proxy_numa_node : int, optional
+            Pin the child process to the CPUs of this NUMA node, see `RemoteObjectProxy`.
+
+        proxy_stats : bool, optional
+            Whether to record the statistics of every call, see `RemoteObjectProxy.get_stats`.
+
+        proxy_trace : bool, optional
+            Whether to record every call as Chrome trace events too, see `RemoteObjectProxy.export_trace`.
+
+        proxy_stream_chunksize : int, optional
+            The number of items pulled at once from a remote generator, see `RemoteObjectProxy`. The methods returning a generator return an async iterator.
+
+        **kwargs
+            The keyword arguments for `remote_obj_creator`, every keyword argument except the `proxy_` options above.
+        """
+        self._start(remote_obj_creator, True, args, kwargs, immutable_attrs=proxy_immutable_attrs, num_of_threads=proxy_num_of_threads,
+                    shared_memory_threshold=proxy_shared_memory_threshold, max_restarts=proxy_max_restarts, context=proxy_context, preload=proxy_preload,
+                    cpu_affinity=proxy_cpu_affinity, numa_node=proxy_numa_node, stats=proxy_stats, trace=proxy_trace, stream_chunksize=proxy_stream_chunksize)
+        self._wait_ready()
+
+    def _start(self, *args, **options):
+        super()._start(*args, **options)
+        self._loop = None
+        """@private"""
+
+    @classmethod
+    async def create(cls, remote_obj_creator, *args, proxy_immutable_attrs=(), proxy_num_of_threads=None, proxy_shared_memory_threshold=None, proxy_call_timeout=None, proxy_max_restarts=0, proxy_context=None, proxy_preload=(), proxy_cpu_affinity=None, proxy_numa_node=None, proxy_stats=False, proxy_trace=False, proxy_stream_chunksize=1000, **kwargs):
+        """
+        Create an `AsyncRemoteObjectProxy` without blocking the running event loop, the parameters are the same as the constructor.
+        """
+        proxy = cls._spawn(remote_obj_creator, True, args, kwargs, immutable_attrs=proxy_immutable_attrs, num_of_threads=proxy_num_of_threads,
+                           shared_memory_threshold=proxy_shared_memory_threshold, max_restarts=proxy_max_restarts, context=proxy_context, preload=proxy_preload,
+                           cpu_affinity=proxy_cpu_affinity, numa_node=proxy_numa_node, stats=proxy_stats, trace=proxy_trace, stream_chunksize=proxy_stream_chunksize)
+        loop = asyncio.get_running_loop()
+        ready = loop.create_future()
+        fd = proxy.parent_conn.fileno()
+        loop.add_reader(fd, lambda: ready.done() or ready.set_result(None))
+        try:
+            await ready
+        finally:
+            loop.remove_reader(fd)
+        proxy._wait_ready()
+        return proxy
+
+    def _new_future(self):
+        """@private"""
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            if self._loop is not None and not self._loop.is_closed():
+                self._loop.remove_reader(self.parent_conn.fileno())
+            loop.add_reader(self.parent_conn.fileno(), self._on_readable)
+            self._loop = loop
+        return loop.create_future()
+
+    def _on_readable(self):
+        """@private"""
+        while not self.parent_conn.closed and self.parent_conn.poll():
+            self._receive_one()
+
+    def _set_future(self, future, ok, value):
+        """@private"""
+        if future.cancelled():
+            return
+        if ok:
+            future.set_result(value)
+        else:
+            future.set_exception(value)
+
+    def _child_died(self):
+        """@private"""
+        if self._loop is not None:
+            if not self._loop.is_closed():
+                self._loop.remove_reader(self.parent_conn.fileno())
+            self._loop = None
+        super()._child_died()
+
+    def _iterator(self, stream):
+        """@private"""
+        return AsyncRemoteIterator(self, stream)
+
+    async def _async_request(self, op, name, args=(), kwargs=None):
+        """@private"""
+        return await self._submit(op, name, args, kwargs)
+
+    async def map(self, method, iterable, chunksize=1000):
+        """
+        Call `method` of the remote object with every item of `iterable` as the argument in chunks, see `RemoteObjectProxy.map`.
+        The Exception of the first failed item is raised, the next chunk is sent after the current one succeeds, so no item after the failed one is run.
+        """
+        results = []
+        for chunk in _chunks(iterable, chunksize):
+            _collect_map(results, await self._submit("map", method, (chunk, True)), True)
+        return results
+
+    async def refresh_schema(self):
+        """
+        Fetch the names of the remote object's methods and attributes (and the values of the immutable attributes) again.
+        """
+        self._schema = await self._submit("schema", None)
+
+    def __getattr__(self, name):
+        schema = self.__dict__.get("_schema")
+        if name.startswith("__") or schema is None:
+            raise AttributeError(name)
+
+        def dynamic_call(*args, **kwargs):
+            return self._submit("call", name, args, kwargs)
+
+        if name in schema["immutable"]:
+            return schema["immutable"][name]
+        if name in schema["callables"]:
+            return dynamic_call
+        if name in schema["attributes"]:
+            return self._async_request("get", name)
+        return _AsyncRemoteAttribute(self, name)
+
+    def close(self):
+        if self._loop is not None and not self._loop.is_closed() and not self.parent_conn.closed:
+            self._loop.remove_reader(self.parent_conn.fileno())
+        self._loop = None
+        super().close()
+
+class _AsyncRemoteAttribute:
+    """@private
+    A name that is not in the schema of `AsyncRemoteObjectProxy`, it can be awaited as an attribute or called as a method.
+    """
+    def __init__(self, proxy, name):
+        self.proxy = proxy
+        self.name = name
+
+    def __call__(self, *args, **kwargs):
+        self.proxy._schema["callables"].add(self.name)
+        return self.proxy._submit("call", self.name, args, kwargs)
+
+    def __await__(self):
+        return self.proxy._async_request("get", self.name).__await__()
+
+class RemoteObjectPool:
+    """
+    RemoteObjectPool is a pool of replicas of the same remote object, each running in its own child process.
+    """
+    def __init__(self, remote_obj_creator, num_of_workers=None, paralle_execution=True, *args, proxy_immutable_attrs=(), proxy_num_of_threads=None, proxy_shared_memory_threshold=None, proxy_call_timeout=None, proxy_max_restarts=0, proxy_context=None, proxy_preload=(), proxy_cpu_affinity=None, proxy_numa_node=None, proxy_placement=None, proxy_stats=False, proxy_trace=False, proxy_stream_chunksize=1000, **kwargs):
+        """
+        This class keeps `num_of_workers` replicas of a remote object and dispatches method calls to idle replicas.
+
+        All child processes are started first and the remote objects are created in parallel, instead of one process launch and one object construction after another.
+
+        Parameters
+        ----------
+        remote_obj_creator : function
+            A function to create the remote object, it is called once in every worker process.
+
+        num_of_workers : int, optional
+            The number of worker processes. Default is `os.cpu_count()`.
+
+        paralle_execution : bool, optional
+            Whether to run the function in parallel. Default is True.
+            In parallel mode a method call returns a `RemoteFuture` as soon as a replica is idle, in sequential mode it waits for the return value.
+            Sequential mode is thread safe, calls from different threads run on different replicas.
+
+        *args
+            The arguments for `remote_obj_creator`.
+
+        proxy_immutable_attrs : iterable of str, optional
+            The attributes of the remote object that never change after it is created, see `RemoteObjectProxy`.
+
+        proxy_num_of_threads : int, optional
+            The number of threads to run method calls in every worker process, see `RemoteObjectProxy`.
+            With threads, a replica is still regarded as busy until all its calls are finished.
+
+        proxy_shared_memory_threshold : int, optional
+            The size in bytes above which buffers are passed by shared memory, see `RemoteObjectProxy`.
+
+        proxy_call_timeout : float, optional
+            The maximum number of seconds to wait for a call in sequential mode, see `RemoteObjectProxy`.
+
+        proxy_max_restarts : int, optional
+            How many times every worker process is restarted if it dies, see `RemoteObjectProxy`.
+            A worker that can not be restarted any more is removed from the pool.
+
+        proxy_context : str or multiprocessing context, optional
+            The start method of the worker processes, see `RemoteObjectProxy`.
+
+        proxy_preload : iterable of str, optional
+            The modules imported by the fork server, see `RemoteObjectProxy`.
+
+        proxy_cpu_affinity : iterable of int, optional
+            The CPUs the worker processes are pinned to, see `RemoteObjectProxy`.
+
+        proxy_numa_node : int, optional
+            Pin the worker processes to the CPUs of this NUMA node, see `RemoteObjectProxy`.
+
+        proxy_placement : str, optional
+            Pin every worker process to its own CPU (Linux only), chosen from the CPUs allowed by `proxy_cpu_affinity` and `proxy_numa_node`. Default is None, all workers share the allowed CPUs.
+            "compact" fills the CPUs of one NUMA node before the next one, "scatter" spreads the workers over the NUMA nodes round-robin.
+            If there are more workers than CPUs, the CPUs are reused in the same order.
+
+        proxy_stats : bool, optional
+            Whether to record the statistics of every call, see `get_stats`.
+
+        proxy_trace : bool, optional
+            Whether to record every call as Chrome trace events too, see `export_trace`.
+
+        proxy_stream_chunksize : int, optional
+            The number of items pulled at once from a remote generator, see `RemoteObjectProxy`. A remote generator is bound to the worker that created it.
+
+        **kwargs
+            The keyword arguments for `remote_obj_creator`, every keyword argument except the `proxy_` options above.
+        """
+        if num_of_workers is None:
+            num_of_workers = os.cpu_count() or 1
+        if num_of_workers <= 0:
+            raise ValueError("num_of_workers should be larger than 0")
+        self.num_of_workers = num_of_workers
+        """@private"""
+        self.paralle_execution = paralle_execution
+        """@private"""
+        options = {"immutable_attrs": proxy_immutable_attrs, "num_of_threads": proxy_num_of_threads, "shared_memory_threshold": proxy_shared_memory_threshold,
+                   "call_timeout": proxy_call_timeout, "max_restarts": proxy_max_restarts, "context": proxy_context, "preload": proxy_preload,
+                   "stats": proxy_stats, "trace": proxy_trace, "stream_chunksize": proxy_stream_chunksize}
+        if proxy_placement is None:
+            affinities = [(proxy_cpu_affinity, proxy_numa_node)] * num_of_workers
+        else:
+            affinities = [([cpu], None) for cpu in _place_workers(proxy_placement, num_of_workers, _resolve_cpus(proxy_cpu_affinity, proxy_numa_node))]
+        self.workers = [RemoteObjectProxy._spawn(remote_obj_creator, True, args, kwargs, cpu_affinity=cpus, numa_node=node, **options)
+                        for cpus, node in affinities]
+        """@private"""
+        try:
+            for worker in self.workers:
+                worker._wait_ready()
+                worker._start_receiver()
+        except BaseException:
+            for worker in self.workers:
+                worker.process.kill()
+            raise
+        self._cond = threading.Condition()
+        """@private"""
+        for worker in self.workers:
+            worker._on_reply = self._notify
+        self._idle = list(self.workers)
+        """@private"""
+
+    def __len__(self):
+        return self.num_of_workers
+
+    def _acquire(self):
+        """@private
+        Take a worker without running calls out of the pool, wait until one finishes if all are busy.
+        """
+        with self._cond:
+            while True:
+                for worker in list(self._idle):
+                    if worker._dead is not None:
+                        self._idle.remove(worker)   # died and can not be restarted
+                    elif not worker._pending:
+                        self._idle.remove(worker)
+                        return worker
+                if not self._idle and all(worker._dead is not None for worker in self.workers):
+                    raise RemoteProcessError("all worker processes are dead")
+                self._cond.wait()
+
+    def _release(self, worker):
+        """@private"""
+        with self._cond:
+            self._idle.append(worker)
+            self._cond.notify()
+
+    def _notify(self, future):
+        """@private
+        Wake up the threads waiting for an idle worker, called by the receiver thread of a worker when a call finishes.
+        """
+        with self._cond:
+            self._cond.notify_all()
+
+    def _submit(self, op, name, args=(), kwargs=None):
+        """@private
+        Send one command to an idle worker and return the `RemoteFuture` of its reply.
+        """
+        worker = self._acquire()
+        try:
+            return worker._submit(op, name, args, kwargs)
+        finally:
+            self._release(worker)
+
+    def _request(self, op, name, args=(), kwargs=None):
+        """@private
+        Send one command to an idle worker and wait for the reply, the Exception is returned instead of raised.
+        """
+        worker = self._acquire()
+        try:
+            return worker._request(op, name, args, kwargs)
+        finally:
+            self._release(worker)
+
+    def map(self, method, iterable, chunksize=1000):
+        """
+        Call `method` of the remote objects with every item of `iterable` as the argument, and return the list of return values.
+
+        Like `RemoteObjectProxy.map`, but the chunks are dispatched to idle replicas and run concurrently.
+        In sequential mode the Exception of the first failed item is raised after the chunks already dispatched are finished.
+
+        Parameters
+        ----------
+        method : str
+            The name of the method.
+
+        iterable : iterable
+            The arguments, one item for one call.
+
+        chunksize : int, optional
+            The number of calls in one message. Default is 1000.
+
+        Returns
+        -------
+        list
+            The return values in the order of `iterable`.
+        """
+        stop_on_error = not self.paralle_execution
+        futures = [self._submit("map", method, (chunk, stop_on_error)) for chunk in _chunks(iterable, chunksize)]
+        results = []
+        for future in futures:
+            _collect_map(results, future.result(), stop_on_error)
+        return results
+
+    def get_cpu_affinity(self):
+        """
+        Return the CPUs every worker process is pinned to, see `RemoteObjectProxy.get_cpu_affinity`.
+        """
+        return [worker.get_cpu_affinity() for worker in self.workers]
+
+    def get_stats(self, per_worker=False):
+        """
+        Return the statistics of the finished calls, the pool should be created with `proxy_stats=True`, see `RemoteObjectProxy.get_stats`.
+
+        Parameters
+        ----------
+        per_worker : bool, optional
+            Whether to return a list of the statistics of every worker. Default is False, the statistics of all workers are merged.
+        """
+        if per_worker:
+            return [worker.get_stats() for worker in self.workers]
+        if self.workers[0]._stats is None:
+            raise RuntimeError("the statistics are not recorded, create the pool with proxy_stats=True")
+        return _CallStats.merge([worker._stats for worker in self.workers])
+
+    def reset_stats(self):
+        """
+        Clear the statistics and the trace events of all workers.
+        """
+        for worker in self.workers:
+            worker.reset_stats()
+
+    def export_trace(self, file_path):
+        """
+        Write the calls of all workers to `file_path` in the Chrome trace event format, the pool should be created with `proxy_trace=True`, see `RemoteObjectProxy.export_trace`.
+        """
+        if self.workers[0]._stats is None:
+            raise RuntimeError("the trace events are not recorded, create the pool with proxy_trace=True")
+        _CallStats.export_trace([worker._stats for worker in self.workers], file_path)
+
+    def refresh_schema(self):
+        """
+        Fetch the names of the remote objects' methods and attributes (and the values of the immutable attributes) again.
+        """
+        for _ in range(self.num_of_workers):
+            worker = self._acquire()
+            try:
+                worker.refresh_schema()
+            finally:
+                self._release(worker)
+
+    def __getattr__(self, name):
+        if name.startswith("__") or "workers" not in self.__dict__:
+            raise AttributeError(name)
+        schema = self.workers[0]._schema
+
+        def dynamic_call(*args, **kwargs):
+            worker = self._acquire()
+            try:
+                return worker._result(worker._submit("call", name, args, kwargs))
+            finally:
+                self._release(worker)
+
+        def dynamic_call_parallel(*args, **kwargs):
+            return self._submit("call", name, args, kwargs)
+
+        if name in schema["immutable"]:
+            return schema["immutable"][name]
+        if name in schema["callables"]:
+            return dynamic_call_parallel if self.paralle_execution else dynamic_call
+        if name in schema["attributes"]:
+            res = self._request("get", name)
+        else:
+            res = self._request("probe", name)
+        if isinstance(res, Exception):
+            if self.paralle_execution:
+                return res
+            else:
+                raise res
+        if isinstance(res, RemoteObjectProxy.IsCallable):
+            for worker in self.workers:
+                worker._schema["callables"].add(name)
+            if self.paralle_execution:
+                return dynamic_call_parallel
+            else:
+                return dynamic_call
+        else:
+            return res
+
+    def close(self):
+        """
+        Close all worker processes.
+        """
+        for worker in self.workers:
+            worker.close()
@@ -15,6 +15,8 @@ downloader = mder.m3u8_downloader(m3u8_file_path='./test.m3u8',temp_file_path='.
 # default : './test.mp4' (type : str)
 # 4.num_of_threads
 # default : 10           (type : int)
+# 5.max_connections_per_host
+# default : None         (type : int)(same as num_of_threads)
 
 downloader.start()
 # parameters
@@ -56,11 +58,12 @@ the structure of ./ is:
 │   ├── qzCFnDUZE9_720_5308_0009.ts
 │   └── qzCFnDUZE9_720_5308_0010.ts  
 ├── test.m3u8
+├── test.mp4
 └── test.py
 ```
 process bar:  <<\*>>  29% 500/1752 [01:33<04:02] <<\*>> 
 
-TS is temp folder, all .ts file are in it. The path of it is %temp_file_path%/TS, in the test case, it is in ./TS. If the mission is not complete, the m3u8 file and TS folder will be reserved, you can instance a new downloader with corresponding TS folder and m3u8 file, and use the start() function to begin, in this way, the mission will go on.
+TS is temp folder, all .ts file are in it. The path of it is %temp_file_path%/TS, in the test case, it is in ./TS. test.mp4 grows while downloading, every segment is appended to it as soon as all segments before it are downloaded, without reading the segment into memory. A segment is written to a .part file chunk by chunk and renamed to .ts when it is complete, so a segment interrupted by a crash is never regarded as downloaded, the next attempt resumes the .part file by an HTTP Range request. Every completed segment is recorded in TS/manifest.jsonl with its expected size, actual size and sha256, only the segments recorded in the manifest with the right size (and checksum, if `verify_checksum`) are skipped when resuming. If the mission is not complete, the m3u8 file and TS folder will be reserved (test.mp4 holds the segments before the first failed one), you can instance a new downloader with corresponding TS folder and m3u8 file, and use the start() function to begin, in this way, the mission will go on.
 
 **after download and download successfully**
 
@@ -71,7 +74,7 @@ the structure of ./ is:
 └── test.py
 ```
 
-If some .ts download failed, the module will redownload for 3 times, and the information will print to the command line
+All threads take segments from one queue, so an idle thread picks up the remaining segments instead of waiting for a slow thread. If some .ts download failed, it is put back to the queue and redownloaded by any thread, 4 times at most, and the information will print to the command line
 
 at last, the command line is like this:
 ```
@@ -84,6 +87,51 @@ thread2 redownload successfully qzCFnDUZE9_720_5308_1722.ts
 <<*>> 100% 1752/1752 [06:26<00:00] <<*>>
 downloading finished 100.00%
 ```
+**playlists**
+
+`m3u8_file_path` can be a local file or a url. A master playlist (#EXT-X-STREAM-INF) is resolved to one of its variants, selected by `bandwidth` and `resolution` (the highest bandwidth by default). A live playlist (without #EXT-X-ENDLIST) is reloaded every target duration, and only the segments after the last seen media sequence are downloaded, until #EXT-X-ENDLIST appears or `start(record_time=...)` seconds are over:
+
+```python
+downloader = mder.m3u8_downloader('https://example.com/live/master.m3u8', temp_file_path='./', mp4_path='./live.mp4', resolution='1280x720')
+downloader.start(mod=3, record_time=3600)  # record one hour
+```
+
+**many downloads**
+
+`DownloadManager` runs many downloads at once over one pool of threads and one connection pool, every `m3u8_downloader` keeps its own state and progress, and the segments of the jobs with a higher priority are downloaded first:
+
+```python
+manager = mder.DownloadManager(num_of_threads=64)
+manager.add(mder.m3u8_downloader('./a.m3u8', temp_file_path='./a', mp4_path='./a.mp4'), priority=1)
+manager.add(mder.m3u8_downloader('./b.m3u8', temp_file_path='./b', mp4_path='./b.mp4'))
+manager.start()
+print(manager.progress())
+manager.wait()
+manager.close()
+```
+
+**bandwidth and concurrency**
+
+`mder.set_bandwidth_limit(bytes_per_second)` limits the total bandwidth of all downloaders in the process by one shared token bucket. With `adaptive_concurrency=True`, the number of requests in flight starts small, grows while the throughput keeps up and is halved when the server is congested (429, 5xx or time out), `num_of_threads` is the upper limit. A failed segment is retried after an exponential backoff with random jitter (and not before the `Retry-After` of a 429/503).
+
+**encryption**
+
+Segments encrypted by `#EXT-X-KEY:METHOD=AES-128` are decrypted (the `cryptography` package is needed). Every key is downloaded once and shared by the segments using it, the IV is taken from the tag or, by default, the media sequence number of the segment. The segments are decrypted chunk by chunk on a thread pool while the next segments are downloading, the TS folder keeps the decrypted segments.
+
+**remux**
+
+The mp4 file is the MPEG-TS segments concatenated, which players and tools have to scan to seek. With `remux=True` (ffmpeg is needed), the segments are piped in order to `ffmpeg -c copy` while the later ones are still downloading, and the output is a fragmented mp4 file, without re-encoding or reading the TS folder again:
+
+```python
+downloader = mder.m3u8_downloader('./test.m3u8', temp_file_path='./', mp4_path='./test.mp4', remux=True)
+downloader.start()
+print(downloader.timings)  # {'download': ..., 'decrypt': ..., 'merge': ..., 'remux': ..., 'total': ...}
+```
+
+**connections**
+
+All threads share one `requests.Session`, the connections are kept alive and reused for the next segments instead of opening a new TCP/TLS connection for every segment. `max_connections_per_host` limits the number of connections to one host, the threads wait for a free connection if all of them are busy, so hundreds of threads can be used without flooding the server. See `examples/benchmark_mder.py` for a comparison with a new connection per segment.
+
 **restart**
 If you want to restart a incomplete mission, you only should use the corresponding TS folder and .m3u8 file
 
@@ -93,12 +141,31 @@ If you want to restart a incomplete mission, you only should use the correspondi
 # author: walkureHHH
 # last modify: 2020/06/17
 import requests
+from requests.adapters import HTTPAdapter
 from urllib.parse import urljoin
 from threading import Thread
 from threading import Lock
+from threading import Condition
+from threading import Event
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import heapq
+import itertools
+import json
 import os
+import random
+import re
+import sys
+import time
 import shutil
+import subprocess
+import tempfile
 from tqdm import tqdm
+try:
+    from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+    from cryptography.hazmat.primitives import padding
+except ImportError:  # only needed by encrypted playlists
+    Cipher = None
 
 
 class thread_num_ERROR(Exception):
@@ -115,6 +182,411 @@ class mod_ERROR(Exception):
     """
     pass
 
+class _InOrderMerger(Thread):
+    """@private
+    Append the segments to the output file in order, as soon as all segments before them are downloaded.
+    With `ffmpeg`, the segments are piped to ffmpeg instead, which remuxes them into a fragmented mp4 file.
+    """
+    def __init__(self, output_path, segment_paths, ffmpeg=None):
+        super().__init__(daemon=True)
+        self.output_path = output_path
+        self.segment_paths = segment_paths
+        self.ffmpeg = ffmpeg
+        self.done = [False]*len(segment_paths)
+        self.finished = False
+        self.merged = 0
+        self.merge_time = 0
+        self.remux_time = 0
+        self.error = None
+        self.cond = Condition()
+
+    def mark_done(self, index):
+        with self.cond:
+            self.done[index] = True
+            self.cond.notify()
+
+    def add(self, path):
+        # a new segment of a live playlist
+        with self.cond:
+            self.segment_paths.append(path)
+            self.done.append(False)
+
+    def finish(self):
+        # no more segment will be downloaded, stop at the first missing one
+        with self.cond:
+            self.finished = True
+            self.cond.notify()
+
+    def run(self):
+        try:
+            self.__run()
+        except Exception as e:
+            # reported by the downloader, which then keeps the segments
+            self.error = '%s: %s'%(type(e).__name__, e)
+
+    def __run(self):
+        if self.ffmpeg is None:
+            # the output is opened once, unbuffered, so `os.sendfile` and the writes of `shutil.copyfileobj` go to the file directly
+            with open(self.output_path, 'wb', buffering=0) as output:
+                self.__merge(output)
+            return
+        # ffmpeg reads the MPEG-TS stream from stdin and only rewrites the container (-c copy), the moov box is written
+        # before the fragments, so the output does not need to be seekable and is playable while it grows.
+        # stderr goes to a temporary file, a pipe could fill up and block ffmpeg while the segments are still written to stdin
+        with tempfile.TemporaryFile() as stderr:
+            process = subprocess.Popen([self.ffmpeg, '-y', '-loglevel', 'error', '-f', 'mpegts', '-i', 'pipe:0', '-c', 'copy',
+                                        '-movflags', 'frag_keyframe+empty_moov+default_base_moof', '-f', 'mp4', self.output_path],
+                                       stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=stderr, bufsize=0)
+            try:
+                self.__merge(process.stdin)
+            except BrokenPipeError:
+                pass   # ffmpeg exited early, its error is reported below
+            finally:
+                try:
+                    process.stdin.close()
+                except BrokenPipeError:
+                    pass
+                start_time = time.perf_counter()
+                process.wait()
+                self.remux_time = time.perf_counter()-start_time
+            if process.returncode != 0:
+                stderr.seek(0)
+                self.error = stderr.read().decode(errors='replace').strip() or 'ffmpeg exited with code '+str(process.returncode)
+
+    def __merge(self, output):
+        index = 0
+        while True:
+            with self.cond:
+                while (index >= len(self.done) or not self.done[index]) and not self.finished:
+                    self.cond.wait()
+                if index >= len(self.done) or not self.done[index]:
+                    break
+                path = self.segment_paths[index]
+            start_time = time.perf_counter()
+            _append_file(path, output)
+            self.merge_time += time.perf_counter()-start_time
+            self.merged += 1
+            index += 1
+
+def _append_file(path, output):
+    """@private
+    Append a file to `output` without reading it into memory.
+    """
+    with open(path, 'rb') as segment:
+        if sys.platform.startswith('linux'):
+            size = os.fstat(segment.fileno()).st_size
+            offset = 0
+            while offset < size:
+                sent = os.sendfile(output.fileno(), segment.fileno(), offset, size-offset)
+                if sent == 0:
+                    break
+                offset += sent
+        else:
+            shutil.copyfileobj(segment, output, 1024*1024)
+
+class TokenBucket:
+    """
+    A token bucket limiting the download bandwidth, it can be shared by many downloaders and threads.
+    """
+    def __init__(self, rate, burst=None):
+        """
+        Parameters
+        ----------
+        rate : float
+            The bandwidth in bytes per second.
+
+        burst : float
+            The bytes that can be downloaded at once after being idle. Default is None, the same as `rate` (one second of data).
+        """
+        if rate <= 0:
+            raise ValueError('the rate should be larger than 0')
+        self.rate = rate
+        """@private"""
+        self.burst = burst if burst is not None else rate
+        """@private"""
+        self.tokens = self.burst
+        """@private"""
+        self.last = time.monotonic()
+        """@private"""
+        self.lock = Lock()
+        """@private"""
+
+    def consume(self, amount):
+        """
+        Take `amount` tokens (bytes), sleep until the bucket has refilled if it goes into debt.
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens+(now-self.last)*self.rate)
+            self.last = now
+            self.tokens -= amount
+            wait = -self.tokens/self.rate if self.tokens < 0 else 0
+        if wait > 0:
+            time.sleep(wait)
+
+_bandwidth_limiter = None
+
+def set_bandwidth_limit(rate, burst=None):
+    """
+    Limit the total download bandwidth of all `m3u8_downloader` in this process.
+
+    Parameters
+    ----------
+    rate : float
+        The bandwidth in bytes per second, None to remove the limit.
+
+    burst : float
+        The bytes that can be downloaded at once after being idle, see `TokenBucket`. Default is None, one second of data.
+    """
+    global _bandwidth_limiter
+    _bandwidth_limiter = TokenBucket(rate, burst) if rate is not None else None
+
+class _AdaptiveConcurrency:
+    """@private
+    Limit the number of requests in flight. If `adaptive`, the limit is tuned in the AIMD way: it is increased by one every
+    window of `limit` successful requests while the throughput keeps up, and halved (at most once a second) when the server
+    is congested (429, 5xx, connection errors and time outs).
+    """
+    def __init__(self, maximum, adaptive):
+        self.maximum = maximum
+        self.adaptive = adaptive
+        self.limit = float(min(maximum, 4) if adaptive else maximum)
+        self.active = 0
+        self.cond = Condition()
+        self.last_decrease = 0
+        self.window_start = time.monotonic()
+        self.window_bytes = 0
+        self.window_count = 0
+        self.last_throughput = None
+
+    def acquire(self):
+        with self.cond:
+            while self.active >= int(self.limit):
+                self.cond.wait()
+            self.active += 1
+
+    def release(self, received=None, congested=False):
+        with self.cond:
+            self.active -= 1
+            if self.adaptive:
+                now = time.monotonic()
+                if congested:
+                    if now-self.last_decrease > 1:
+                        self.limit = max(1.0, self.limit/2)
+                        self.last_decrease = now
+                        self.__new_window(now, None)
+                elif received is not None:
+                    self.window_bytes += received
+                    self.window_count += 1
+                    if self.window_count >= int(self.limit):
+                        throughput = self.window_bytes/max(now-self.window_start, 1e-6)
+                        if self.last_throughput is None or throughput >= 0.9*self.last_throughput:
+                            self.limit = min(float(self.maximum), self.limit+1)
+                        self.__new_window(now, throughput)
+            self.cond.notify_all()
+
+    def __new_window(self, now, throughput):
+        self.window_start = now
+        self.window_bytes = 0
+        self.window_count = 0
+        self.last_throughput = throughput
+
+class _WorkQueue:
+    """@private
+    The work queue of the download threads. The items with a higher priority are taken first, the items of the same priority in order.
+    The retried items are delayed, they are not taken before their backoff is over.
+    After `close`, the queued items are dropped and `get` returns None.
+    """
+    def __init__(self):
+        self.ready = []
+        self.delayed = []
+        self.counter = itertools.count()
+        self.cond = Condition()
+        self.closed = False
+
+    def put(self, item, priority=0, delay=0):
+        with self.cond:
+            if self.closed:
+                return
+            if delay > 0:
+                heapq.heappush(self.delayed, (time.monotonic()+delay, next(self.counter), priority, item))
+            else:
+                heapq.heappush(self.ready, (-priority, next(self.counter), item))
+            self.cond.notify()
+
+    def get(self):
+        with self.cond:
+            while True:
+                if self.closed:
+                    return None
+                now = time.monotonic()
+                while self.delayed and self.delayed[0][0] <= now:
+                    _, order, priority, item = heapq.heappop(self.delayed)
+                    heapq.heappush(self.ready, (-priority, order, item))
+                if self.ready:
+                    return heapq.heappop(self.ready)[2]
+                self.cond.wait(self.delayed[0][0]-now if self.delayed else None)
+
+    def close(self):
+        with self.cond:
+            self.closed = True
+            self.ready = []
+            self.delayed = []
+            self.cond.notify_all()
+
+def _parse_attributes(text):
+    """@private
+    Parse the attribute list of a tag, e.g. 'BANDWIDTH=1280000,RESOLUTION=1280x720,CODECS="avc1.4d401f,mp4a.40.2"'.
+    """
+    return {key: value.strip('"') for key, value in re.findall(r'([A-Z0-9-]+)=("[^"]*"|[^,]*)', text)}
+
+def _resolve(base_url, uri):
+    """@private"""
+    return urljoin(base_url, uri) if base_url is not None else uri
+
+def parse_master_playlist(text, base_url=None):
+    """
+    Parse the variants of a master playlist.
+
+    Parameters
+    ----------
+    text : str
+        The content of the master playlist.
+
+    base_url : str
+        The url the relative variant urls are resolved against. Default is None, not resolved.
+
+    Returns
+    -------
+    list of dict
+        One dict for every `#EXT-X-STREAM-INF`, with the keys "uri", "bandwidth" (int), "resolution" ((width, height) or None) and "attributes" (all attributes of the tag).
+    """
+    variants = []
+    attributes = None
+    for line in text.splitlines():
+        line = line.strip()
+        if line.startswith('#EXT-X-STREAM-INF:'):
+            attributes = _parse_attributes(line[len('#EXT-X-STREAM-INF:'):])
+        elif line and not line.startswith('#') and attributes is not None:
+            resolution = attributes.get('RESOLUTION')
+            variants.append({
+                'uri': _resolve(base_url, line),
+                'bandwidth': int(attributes.get('BANDWIDTH', 0)),
+                'resolution': tuple(int(i) for i in resolution.lower().split('x')) if resolution else None,
+                'attributes': attributes,
+            })
+            attributes = None
+    return variants
+
+def select_variant(variants, bandwidth=None, resolution=None):
+    """
+    Select a variant of a master playlist.
+
+    Parameters
+    ----------
+    variants : list of dict
+        The variants returned by `parse_master_playlist`.
+
+    bandwidth : int or str
+        The maximum bandwidth in bits per second, the variant with the highest bandwidth not larger than it is selected (the lowest one if all are larger).
+        "max" or "min" select the highest or the lowest bandwidth. Default is None, "max" if `resolution` is None too.
+
+    resolution : str or tuple
+        The resolution, e.g. "1280x720" or (1280, 720). The variants with the closest height are selected first, then `bandwidth` decides among them. Default is None.
+
+    Returns
+    -------
+    dict
+        The selected variant.
+    """
+    if not variants:
+        raise ValueError('the master playlist has no variant')
+    candidates = variants
+    if resolution is not None:
+        if isinstance(resolution, str):
+            resolution = tuple(int(i) for i in resolution.lower().split('x'))
+        with_resolution = [v for v in variants if v['resolution'] is not None]
+        if with_resolution:
+            distance = lambda v: abs(v['resolution'][1]-resolution[1])
+            closest = min(distance(v) for v in with_resolution)
+            candidates = [v for v in with_resolution if distance(v) == closest]
+    if bandwidth is None or bandwidth == 'max':
+        return max(candidates, key=lambda v: v['bandwidth'])
+    if bandwidth == 'min':
+        return min(candidates, key=lambda v: v['bandwidth'])
+    fitting = [v for v in candidates if v['bandwidth'] <= bandwidth]
+    if fitting:
+        return max(fitting, key=lambda v: v['bandwidth'])
+    return min(candidates, key=lambda v: v['bandwidth'])
+
+def _parse_media_playlist(text, base_url=None):
+    """@private
+    Parse a media playlist, return the segments (dicts of "uri", "sequence" and "key"), the target duration and whether the playlist is complete (#EXT-X-ENDLIST).
+    The "key" of a segment is None or a dict of "uri" and "iv" (bytes or None) of its AES-128 key.
+    """
+    segments = []
+    sequence = 0
+    target_duration = None
+    endlist = False
+    key = None
+    for line in text.splitlines():
+        line = line.strip()
+        if line.startswith('#EXT-X-KEY:'):
+            attributes = _parse_attributes(line[len('#EXT-X-KEY:'):])
+            method = attributes.get('METHOD', 'NONE')
+            if method == 'NONE':
+                key = None
+            elif method == 'AES-128':
+                iv = attributes.get('IV')
+                key = {'uri': _resolve(base_url, attributes['URI']), 'iv': bytes.fromhex(iv[2:]) if iv else None}
+            else:
+                raise ValueError('unsupported encryption method '+method)
+        elif line.startswith('#EXT-X-MEDIA-SEQUENCE:'):
+            sequence = int(line.split(':', 1)[1])
+        elif line.startswith('#EXT-X-TARGETDURATION:'):
+            target_duration = float(line.split(':', 1)[1])
+        elif line.startswith('#EXT-X-ENDLIST'):
+            endlist = True
+        elif line and not line.startswith('#'):
+            segments.append({'uri': _resolve(base_url, line), 'sequence': sequence, 'key': key})
+            sequence += 1
+    return segments, target_duration, endlist
+
+def _decrypt_file(src, dst, key, iv, chunk_size):
+    """@private
+    Decrypt an AES-128 (CBC, PKCS7 padding) encrypted file chunk by chunk, return the size and the sha256 of the plain file.
+    """
+    decryptor = Cipher(algorithms.AES(key), modes.CBC(iv)).decryptor()
+    unpadder = padding.PKCS7(128).unpadder()
+    checksum = hashlib.sha256()
+    size = 0
+    with open(src, 'rb') as encrypted, open(dst, 'wb') as plain:
+        for chunk in iter(lambda: encrypted.read(chunk_size), b''):
+            data = unpadder.update(decryptor.update(chunk))
+            plain.write(data)
+            checksum.update(data)
+            size += len(data)
+        data = unpadder.update(decryptor.finalize())+unpadder.finalize()
+        plain.write(data)
+        checksum.update(data)
+        size += len(data)
+    return size, checksum.hexdigest()
+
+def _is_url(path):
+    """@private"""
+    return path.startswith('http://') or path.startswith('https://')
+
+def _read_playlist(path):
+    """@private
+    Read a playlist from a local file or a url.
+    """
+    if _is_url(path):
+        res = requests.get(path, timeout=60)
+        res.raise_for_status()
+        return res.text
+    with open(path, 'r') as m3u8:
+        return m3u8.read()
+
 class m3u8_downloader:
     """
     M3u8 downloader.
@@ -127,31 +599,32 @@ class m3u8_downloader:
     """@private"""
     m3u8_file_path = ''
     """@private"""
-    urls = []
-    """@private"""
-    names = []
+    total = 0
     """@private"""
-    has_download_name = []
+    max_attempts = 5
     """@private"""
-    cant_dow = []
+    chunk_size = 64*1024
     """@private"""
-    total = 0
+    base_backoff = 0.5
     """@private"""
-    lock = Lock()
+    max_backoff = 30
     """@private"""
-    def __init__(self,m3u8_file_path, url_prefix=None,temp_file_path='.',mp4_path='./test.mp4',num_of_threads=10):
+    def __init__(self,m3u8_file_path, url_prefix=None,temp_file_path='.',mp4_path='./test.mp4',num_of_threads=10,max_connections_per_host=None,verify_checksum=False,bandwidth=None,resolution=None,adaptive_concurrency=False,remux=False):
         """
         Initialize the m3u8 downloader.
 
         Parameters
         ----------
         m3u8_file_path : str
-            The path of the m3u8 file.
+            The path or the url of the m3u8 file.
+            If it is a master playlist, a variant is selected by `bandwidth` and `resolution`, and its media playlist is downloaded.
+            If the media playlist has no #EXT-X-ENDLIST (a live playlist), it is polled for new segments until #EXT-X-ENDLIST appears or `record_time` of `start` is over.
 
         url_prefix : str
             The prefix of the url. Default is None.
             Some m3u8 file has not the full url, so you can add the prefix to the url.
             For example, the url is '/video/1.ts', and the prefix is 'http://www.example.com'.
+            For a master playlist, the prefix is added to the variant urls, the segment urls of the selected variant are resolved against the variant url.
 
         temp_file_path : str
             The path of the temporary folder (store *.ts files). Default is '.'.
@@ -162,35 +635,110 @@ class m3u8_downloader:
         num_of_threads : int
             The number of threads. Default is 10.
 
+        max_connections_per_host : int
+            The maximum number of kept-alive connections to one host, shared by all threads. Default is None, the same as `num_of_threads`.
+            The threads wait for a free connection if all of them are busy.
+
+        verify_checksum : bool
+            Whether to check the sha256 of the downloaded segments against the manifest when resuming. Default is False, only the sizes are checked.
+
+        bandwidth : int or str
+            The maximum bandwidth (bits per second), "max" or "min", used to select the variant of a master playlist, see `select_variant`. Default is None, the highest bandwidth.
+
+        resolution : str or tuple
+            The resolution, e.g. "1280x720", used to select the variant of a master playlist, see `select_variant`. Default is None.
+
+        adaptive_concurrency : bool
+            Whether to tune the number of requests in flight by the throughput and the errors, between 1 and `num_of_threads`. Default is False, `num_of_threads` requests.
+            It starts from 4 requests, grows by one while the throughput keeps up and is halved when the server is congested (429, 5xx or time out).
+
+        remux : bool or str
+            Whether to remux the segments into a fragmented mp4 file by ffmpeg (`-c copy`, no re-encoding), True for the ffmpeg in PATH or the path of ffmpeg. Default is False, the mp4 file is the concatenated MPEG-TS segments.
+            The segments are piped to ffmpeg in order while the later ones are still downloading. If ffmpeg is not found, a warning is printed and the segments are concatenated.
+
         """
         if num_of_threads <= 0:
             raise thread_num_ERROR('the number of threads can\'t smaller than 0')
+        if max_connections_per_host is None:
+            max_connections_per_host = num_of_threads
+        if max_connections_per_host <= 0:
+            raise ValueError('the number of connections per host should be larger than 0')
+        self.max_connections_per_host = max_connections_per_host
+        """@private"""
+        self.adaptive_concurrency = adaptive_concurrency
+        """@private"""
+        self.ffmpeg = None
+        """@private"""
+        if remux:
+            self.ffmpeg = shutil.which('ffmpeg' if remux is True else remux)
+            if self.ffmpeg is None:
+                print('warning: ffmpeg is not found, the segments will be concatenated without remuxing')
+        self.timings = {}
+        """
+        The seconds spent in every stage of the last run: "download" (until the last segment is saved), "decrypt" (summed over the decryption threads),
+        "merge" (appending the segments to the mp4 file, or piping them to ffmpeg), "remux" (waiting for ffmpeg after the last segment) and "total".
+        """
+        self.decrypt_time = 0
+        """@private"""
         self.mp4_path = mp4_path
         self.temp_file_path = temp_file_path 
         self.num_of_threads = num_of_threads
         self.m3u8_file_path = m3u8_file_path
+        # the state of the download belongs to this instance, so the downloaders in one process do not share it
+        self.lock = Lock()
+        """@private"""
+        self.cant_dow = []
+        """@private"""
+        self.finished = Event()
+        """@private"""
+        self.manifest_path = self.temp_file_path+'/TS/manifest.jsonl'
+        """@private"""
         if os.path.exists(self.temp_file_path+'/TS'):
             print("""warning: the temporary folder has exited\n 
 please comfirm the temporary folder included the fragment video you need""")
-            self.has_download_name = os.listdir(self.temp_file_path+'/TS')
+            self.has_download_name = self._check_manifest(self.temp_file_path+'/TS', self.manifest_path, verify_checksum)
         else:
             os.mkdir(self.temp_file_path+'/TS')
-            self.has_download_name = []
-        with open(self.m3u8_file_path,'r') as m3u8:
-            temp_url = [m3u8_lines.replace('\n','') for m3u8_lines in m3u8.readlines() if m3u8_lines.startswith('#')==False]
-        if url_prefix != None:
-            temp_url = [urljoin(url_prefix, i) for i in temp_url]
+            self.has_download_name = set()
+        self.playlist_path = self.m3u8_file_path
+        """@private"""
+        text = _read_playlist(self.playlist_path)
+        if '#EXT-X-STREAM-INF' in text:
+            base_url = url_prefix if url_prefix is not None or not _is_url(self.playlist_path) else self.playlist_path
+            variant = select_variant(parse_master_playlist(text, base_url), bandwidth, resolution)
+            print('select variant', variant['uri'], 'bandwidth', variant['bandwidth'], 'resolution', variant['resolution'])
+            self.playlist_path = variant['uri']
+            text = _read_playlist(self.playlist_path)
+            # the media playlist is resolved against its own url, url_prefix only applies to the master playlist
+            self.base_url = self.playlist_path if _is_url(self.playlist_path) else None
+            """@private"""
+        else:
+            self.base_url = url_prefix if url_prefix is not None or not _is_url(self.playlist_path) else self.playlist_path
+        segments, self.target_duration, endlist = _parse_media_playlist(text, self.base_url)
+        self.live = not endlist
+        """@private"""
+        self.last_sequence = segments[-1]['sequence'] if segments else -1
+        """@private"""
+        temp_url = [segment['uri'] for segment in segments]
+        self.keys = [segment['key'] for segment in segments]
+        """@private"""
+        self.sequences = [segment['sequence'] for segment in segments]
+        """@private"""
+        self.key_cache = {}
+        """@private"""
+        self.key_lock = Lock()
+        """@private"""
         self.total = len(temp_url)
         self.names = [i.split('/')[-1].split('?')[0] for i in temp_url]
-        self.urls = [[] for j in range(0, self.num_of_threads)]
-        for index, el in enumerate(temp_url):
-            self.urls[index%self.num_of_threads].append(el)
+        self.urls = temp_url
         return
     
-    def start(self,mod = 0, time_out = 60):
+    def start(self,mod = 0, time_out = 60, record_time = None):
         """
         Start download.
 
+        The download runs on a `DownloadManager` of its own, use `DownloadManager.add` to run many downloads over the same threads and connections.
+
         Parameters
         ----------
         mod : int
@@ -202,70 +750,502 @@ please comfirm the temporary folder included the fragment video you need""")
             
         time_out : int
             The time out of the download. Default is 60s.
+
+        record_time : float
+            The maximum seconds to poll a live playlist for new segments. Default is None, until #EXT-X-ENDLIST appears.
+        """
+        manager = DownloadManager(self.num_of_threads, self.max_connections_per_host, self.adaptive_concurrency)
+        manager.add(self, mod=mod, time_out=time_out, record_time=record_time)
+        manager.run()
+
+    def progress(self):
+        """
+        Return the progress of the download.
+
+        Returns
+        -------
+        dict
+            "name" (the mp4 path), "done" (the number of downloaded segments), "total" (the number of segments, it grows for live playlists), "failed" (the number of segments given up) and "finished".
+        """
+        with self.lock:
+            return {
+                'name': self.mp4_path,
+                'done': sum(names in self.has_download_name for names in self.names),
+                'total': self.total,
+                'failed': len(self.cant_dow),
+                'finished': self.finished.is_set(),
+            }
+
+    def _attach(self, manager, priority, mod, time_out, record_time, position):
+        """@private
+        Prepare to run on `manager`.
         """
         if mod not in [0,1,2,3]:
             raise mod_ERROR('Only have mod 0 , 1 , 2 or 3')
-        with tqdm(total=self.total,bar_format='<<*>> {percentage:3.0f}% {n_fmt}/{total_fmt} [{elapsed}<{remaining}] <<*>> ') as jdt:
-            Threads = []
-            for i in range(self.num_of_threads):
-                thread = Thread(target=self.__download, args=(self.urls[i],'thread'+str(i),jdt,time_out))
-                Threads.append(thread)
-            for threads in Threads:
-                threads.start()
-            for threads in Threads:
-                threads.join()
-        percent = '%.02f%%'%((len(self.has_download_name)/len(self.names))*100)
-        if len(self.has_download_name)==len(self.names):
-            print('downloading finished',percent)
-            for names in self.names:
-                ts = open(self.temp_file_path+'/TS/'+names,'rb')
-                with open(self.mp4_path,'ab') as mp4:
-                    mp4.write(ts.read())
-                ts.close()
-            if mod == 0 or mod == 1:
+        self.manager = manager
+        """@private"""
+        self.priority = priority
+        """@private"""
+        self.mod = mod
+        """@private"""
+        self.time_out = time_out
+        """@private"""
+        self.record_time = record_time
+        """@private"""
+        self.position = position
+        """@private"""
+
+    def _begin(self):
+        """@private
+        Queue the segments on the manager, called when the manager is running.
+        """
+        self.start_time = time.perf_counter()
+        """@private"""
+        self.decrypt_time = 0
+        self.manifest = open(self.manifest_path, 'a')
+        """@private"""
+        self.jdt = tqdm(total=self.total,desc=os.path.basename(self.mp4_path),position=self.position,bar_format='{desc} <<*>> {percentage:3.0f}% {n_fmt}/{total_fmt} [{elapsed}<{remaining}] <<*>> ')
+        """@private"""
+        # the segments are merged into the mp4 file in order while the later ones are still downloading
+        self.merger = _InOrderMerger(self.mp4_path, [self.temp_file_path+'/TS/'+names for names in self.names], self.ffmpeg)
+        """@private"""
+        # the number of queued segments, the download is finished when it drops to 0 and the live playlist is not polled any more,
+        # it starts from 1 until all segments are queued
+        self.pending = 1
+        """@private"""
+        self.polling = self.live
+        """@private"""
+        for index, (urls, names) in enumerate(zip(self.urls, self.names)):
+            if names in self.has_download_name:
+                self.merger.mark_done(index)
+                self.jdt.update(1)
+            else:
+                self.__put((index, urls, 1))
+        self.merger.start()
+        if self.live:
+            Thread(target=self.__poll, daemon=True).start()
+        self._task_done()
+
+    def __put(self, task, delay=0):
+        with self.lock:
+            self.pending += 1
+        self.manager.queue.put((self, task), self.priority, delay)
+
+    def _task_done(self):
+        """@private"""
+        with self.lock:
+            self.pending -= 1
+            finished = self.pending == 0 and not self.polling
+        if finished:
+            self.__finalize()
+
+    def __finalize(self):
+        download_time = time.perf_counter()-self.start_time
+        self.merger.finish()
+        self.merger.join()
+        self.jdt.close()
+        self.manifest.close()
+        self.timings = {'download': download_time, 'decrypt': self.decrypt_time, 'merge': self.merger.merge_time,
+                        'remux': self.merger.remux_time, 'total': time.perf_counter()-self.start_time}
+        print(self.mp4_path, 'stage times:', ', '.join(stage+' %.2fs'%seconds for stage, seconds in self.timings.items()))
+        downloaded = sum(names in self.has_download_name for names in self.names)
+        percent = '%.02f%%'%((downloaded/len(self.names))*100) if self.names else '100.00%'
+        if self.merger.error is not None:
+            # the segments are kept, so the download can be merged again
+            print(self.mp4_path,'merging failed:',self.merger.error)
+        elif downloaded==len(self.names) and self.merger.merged==len(self.names):
+            print(self.mp4_path,'downloading finished',percent)
+            if (self.mod == 0 or self.mod == 1) and not _is_url(self.m3u8_file_path):
                 os.remove(self.m3u8_file_path)
-            if mod == 0 or mod == 2:
+            if self.mod == 0 or self.mod == 2:
                 shutil.rmtree(self.temp_file_path+'/TS')
         else:
             print('----------------------------------------------------------------')
             for cantdow_urls in self.cant_dow:
                 print('downloading fail:',cantdow_urls)
-            print('incomplete downloading',percent)
+            print(self.mp4_path,'incomplete downloading',percent)
+            print('the first',self.merger.merged,'segments are merged into',self.mp4_path)
+        self.finished.set()
 
-    def __download(self, download_list, thread_name, jdt, time_out):
-        for urls in download_list:
-            if urls.split('/')[-1].split('?')[0] not in self.has_download_name:
-                for i in range(0,5):
+    def __poll(self):
+        # reload the live playlist every target duration, only the segments after the last seen media sequence are queued
+        deadline = None if self.record_time is None else time.monotonic()+self.record_time
+        failures = 0
+        while deadline is None or time.monotonic() < deadline:
+            interval = self.target_duration or 10
+            time.sleep(interval if deadline is None else max(min(interval, deadline-time.monotonic()), 0))
+            try:
+                segments, target_duration, endlist = _parse_media_playlist(_read_playlist(self.playlist_path), self.base_url)
+                failures = 0
+            except Exception as e:
+                failures += 1
+                with self.lock:
+                    print('\nreload playlist failed', e)
+                if failures >= self.max_attempts:
+                    break
+                continue
+            self.target_duration = target_duration or self.target_duration
+            new_segments = [segment for segment in segments if segment['sequence'] > self.last_sequence]
+            if new_segments and new_segments[0]['sequence'] > self.last_sequence+1:
+                with self.lock:
+                    print('\nmissed', new_segments[0]['sequence']-self.last_sequence-1, 'segments, they have left the live playlist')
+            for segment in new_segments:
+                name = segment['uri'].split('/')[-1].split('?')[0]
+                with self.lock:
+                    index = len(self.urls)
+                    self.urls.append(segment['uri'])
+                    self.names.append(name)
+                    self.keys.append(segment['key'])
+                    self.sequences.append(segment['sequence'])
+                    self.total += 1
+                    self.jdt.total = self.total
+                    self.jdt.refresh()
+                self.merger.add(self.temp_file_path+'/TS/'+name)
+                if name in self.has_download_name:
+                    self.merger.mark_done(index)
+                    self.jdt.update(1)
+                else:
+                    self.__put((index, segment['uri'], 1))
+                self.last_sequence = segment['sequence']
+            if endlist:
+                self.live = False
+                break
+        with self.lock:
+            self.polling = False
+            self.pending += 1
+        self._task_done()
+
+    @staticmethod
+    def _make_session(max_connections_per_host):
+        """@private
+        Create the session shared by all threads, it keeps at most `max_connections_per_host` connections to every host alive and blocks when all of them are in use.
+        """
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_maxsize=max_connections_per_host, pool_block=True)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    @staticmethod
+    def _check_manifest(folder, manifest_path, verify_checksum):
+        """@private
+        Return the set of segments recorded in the manifest whose files are complete.
+        The .ts files not recorded in the manifest are not trusted, they are downloaded again.
+        """
+        records = {}
+        if os.path.exists(manifest_path):
+            with open(manifest_path, 'r') as manifest:
+                for line in manifest:
                     try:
-                        conn = requests.get(urls,timeout=time_out)
-                        if conn.status_code == 200:
-                            with open(self.temp_file_path+'/TS/'+urls.split('/')[-1].split('?')[0],'wb') as ts:
-                                ts.write(conn.content)
-                            with self.lock:
-                                if i != 0:
-                                    print('\n'+thread_name,'redownload successfully',urls.split('/')[-1].split('?')[0])
-                                self.has_download_name.append(urls.split('/')[-1].split('?')[0])
-                                jdt.update(1)
-                            break
-                        else:
-                            with self.lock:
-                                if i == 0:
-                                    print('\n'+thread_name,conn.status_code,urls.split('/')[-1].split('?')[0],'begin retry 1')
-                                else:
-                                    print('\n'+thread_name,conn.status_code,urls.split('/')[-1].split('?')[0],'Retry '+ str(i) +'/3')
-                                if i == 4:
-                                    self.cant_dow.append(urls)
-                    except:
-                        with self.lock:
-                            if i == 0:
-                                print('\n'+thread_name,'Time out ERROR',urls.split('/')[-1].split('?')[0],'begin retry 1')
-                            else:
-                                print('\n'+thread_name,'Time out ERROR',urls.split('/')[-1].split('?')[0],'Retry '+ str(i) +'/3')
-                            if i == 4:
-                                self.cant_dow.append(urls)
+                        record = json.loads(line)
+                    except ValueError:   # the last line written by a killed run
+                        continue
+                    records[record['name']] = record
+        has_download_name = set()
+        for name, record in records.items():
+            path = folder+'/'+name
+            if not os.path.exists(path) or os.path.getsize(path) != record['size']:
+                continue
+            if verify_checksum and _sha256(path) != record['sha256']:
+                continue
+            has_download_name.add(name)
+        return has_download_name
+
+    def _download(self, task, thread_name):
+        """@private
+        Download one segment, called by the threads of the manager.
+        """
+        index, urls, attempt = task
+        name = urls.split('/')[-1].split('?')[0]
+        path = self.temp_file_path+'/TS/'+name
+        key = self.keys[index]
+        concurrency = self.manager.concurrency
+        handed_over = False
+        try:
+            if key is not None:
+                key_bytes = self.__get_key(key['uri'])
+            # resume the .part file left by a failed attempt or a killed run
+            offset = os.path.getsize(path+'.part') if os.path.exists(path+'.part') else 0
+            headers = {'Range': 'bytes='+str(offset)+'-'} if offset else None
+            concurrency.acquire()
+            try:
+                with self.manager.session.get(urls,timeout=self.time_out,stream=True,headers=headers) as conn:
+                    if conn.status_code in (200, 206):
+                        record = self.__save(conn, path, name, path+'.enc' if key is not None else path)
+                    status_code = conn.status_code
+                    retry_after = conn.headers.get('Retry-After')
+            except Exception:
+                concurrency.release(congested=True)
+                raise
+            concurrency.release(record['size']-offset if status_code in (200, 206) else None, status_code == 429 or status_code >= 500)
+            if status_code == 416:
+                os.remove(path+'.part')   # the .part file does not match the segment any more
+            if status_code in (200, 206):
+                if key is not None:
+                    # the default IV is the media sequence number of the segment
+                    iv = key['iv'] if key['iv'] is not None else self.sequences[index].to_bytes(16, 'big')
+                    self.manager.decryptor.submit(self.__decrypt, index, urls, attempt, thread_name, record, key_bytes, iv)
+                    handed_over = True   # the decryption marks the task done
+                else:
+                    self.__finish(index, attempt, thread_name, record)
             else:
-                with self.lock:
-                    jdt.update(1)
+                self.__retry(index, urls, attempt, thread_name, status_code,
+                             float(retry_after) if retry_after is not None and retry_after.isdigit() else None)
+        except Exception:
+            self.__retry(index, urls, attempt, thread_name, 'Time out ERROR')
+        finally:
+            if not handed_over:
+                self._task_done()
+
+    def __get_key(self, uri):
+        # every key is downloaded once, the segments sharing it take it from the cache
+        with self.key_lock:
+            if uri not in self.key_cache:
+                if Cipher is None:
+                    raise ImportError('the encrypted playlist needs the cryptography package')
+                res = self.manager.session.get(uri, timeout=self.time_out)
+                res.raise_for_status()
+                if len(res.content) != 16:
+                    raise ValueError('the AES-128 key should be 16 bytes, got '+str(len(res.content)))
+                self.key_cache[uri] = res.content
+            return self.key_cache[uri]
+
+    def __decrypt(self, index, urls, attempt, thread_name, record, key, iv):
+        path = self.temp_file_path+'/TS/'+record['name']
+        try:
+            start_time = time.perf_counter()
+            record['size'], record['sha256'] = _decrypt_file(path+'.enc', path+'.dec', key, iv, self.chunk_size)
+            with self.lock:
+                self.decrypt_time += time.perf_counter()-start_time
+            os.replace(path+'.dec', path)
+            os.remove(path+'.enc')
+            self.__finish(index, attempt, thread_name, record)
+        except Exception:
+            self.__retry(index, urls, attempt, thread_name, 'Decryption ERROR')
+        finally:
+            self._task_done()
+
+    def __finish(self, index, attempt, thread_name, record):
+        with self.lock:
+            if attempt != 1:
+                print('\n'+thread_name,'redownload successfully',record['name'])
+            self.manifest.write(json.dumps(record)+'\n')
+            self.manifest.flush()
+            self.has_download_name.add(record['name'])
+            self.jdt.update(1)
+        self.merger.mark_done(index)
+
+    def __save(self, conn, path, name, target):
+        # write the body chunk by chunk to a .part file, and rename it when it is complete,
+        # so an interrupted segment is never regarded as downloaded
+        part_path = path+'.part'
+        checksum = hashlib.sha256()
+        size = 0
+        expected = None
+        if conn.status_code == 206:
+            # the rest of a .part file, "Content-Range: bytes start-end/total"
+            content_range = conn.headers.get('Content-Range', '')
+            start = content_range.split(' ')[-1].split('-')[0]
+            total = content_range.split('/')[-1]
+            if not start.isdigit() or int(start) != os.path.getsize(part_path):
+                raise IOError('unexpected Content-Range '+content_range)
+            expected = int(total) if total.isdigit() else None
+            mode = 'ab'
+            with open(part_path,'rb') as ts:
+                for chunk in iter(lambda: ts.read(self.chunk_size), b''):
+                    checksum.update(chunk)
+                    size += len(chunk)
+        else:
+            mode = 'wb'
+            if 'Content-Length' in conn.headers and 'Content-Encoding' not in conn.headers:
+                expected = int(conn.headers['Content-Length'])
+        with open(part_path,mode) as ts:
+            for chunk in conn.iter_content(chunk_size=self.chunk_size):
+                if _bandwidth_limiter is not None:
+                    _bandwidth_limiter.consume(len(chunk))
+                ts.write(chunk)
+                checksum.update(chunk)
+                size += len(chunk)
+        if expected is not None and expected != size:
+            raise IOError('incomplete segment, received '+str(size)+' of '+str(expected)+' bytes')
+        os.replace(part_path, target)
+        return {'name': name, 'expected_size': expected, 'size': size, 'sha256': checksum.hexdigest()}
+
+    def __retry(self, index, urls, attempt, thread_name, reason, retry_after=None):
+        # put the failed segment back to the queue after an exponential backoff with full jitter, any thread can take it
+        name = urls.split('/')[-1].split('?')[0]
+        if attempt < self.max_attempts:
+            delay = random.uniform(0, min(self.max_backoff, self.base_backoff*2**(attempt-1)))
+            if retry_after is not None:
+                delay = max(delay, retry_after)
+            with self.lock:
+                print('\n'+thread_name,reason,name,'Retry '+str(attempt)+'/'+str(self.max_attempts-1),'in %.1fs'%delay)
+            self.__put((index, urls, attempt+1), delay)
+        else:
+            with self.lock:
+                print('\n'+thread_name,reason,name,'give up')
+                self.cant_dow.append(urls)
+
+class DownloadManager:
+    """
+    Run many `m3u8_downloader` jobs concurrently over one pool of download threads, one connection pool and one decryption pool.
+    """
+    def __init__(self, num_of_threads=32, max_connections_per_host=None, adaptive_concurrency=False):
+        """
+        Initialize the download manager.
+
+        The state of every job (segments, progress, manifest, output) belongs to its `m3u8_downloader`, only the threads and the connections are shared.
+        The threads take the segments of the job with the highest priority first, the segments of jobs with the same priority are taken in the order they are queued.
+
+        Example:
+
+        ```python
+        manager = mder.DownloadManager(num_of_threads=64)
+        manager.add(mder.m3u8_downloader('./a.m3u8', temp_file_path='./a', mp4_path='./a.mp4'), priority=1)
+        manager.add(mder.m3u8_downloader('./b.m3u8', temp_file_path='./b', mp4_path='./b.mp4'))
+        manager.run()   # or start(), then progress() and wait(), then close()
+        ```
+
+        Parameters
+        ----------
+        num_of_threads : int
+            The number of download threads shared by all jobs. Default is 32.
+
+        max_connections_per_host : int
+            The maximum number of kept-alive connections to one host, shared by all jobs. Default is None, the same as `num_of_threads`.
+
+        adaptive_concurrency : bool
+            Whether to tune the number of requests in flight by the throughput and the errors, see `m3u8_downloader`. Default is False.
+        """
+        if num_of_threads <= 0:
+            raise thread_num_ERROR('the number of threads can\'t smaller than 0')
+        if max_connections_per_host is None:
+            max_connections_per_host = num_of_threads
+        if max_connections_per_host <= 0:
+            raise ValueError('the number of connections per host should be larger than 0')
+        self.num_of_threads = num_of_threads
+        """@private"""
+        self.max_connections_per_host = max_connections_per_host
+        """@private"""
+        self.jobs = []
+        """@private"""
+        self.queue = _WorkQueue()
+        """@private"""
+        self.concurrency = _AdaptiveConcurrency(num_of_threads, adaptive_concurrency)
+        """@private"""
+        self.threads = []
+        """@private"""
+        self.session = None
+        """@private"""
+        self.decryptor = None
+        """@private"""
+        self.lock = Lock()
+        """@private"""
+
+    def add(self, downloader, priority=0, mod=0, time_out=60, record_time=None):
+        """
+        Add a job, it starts at once if the manager is running.
+
+        Parameters
+        ----------
+        downloader : m3u8_downloader
+            The job. Its `num_of_threads`, `max_connections_per_host` and `adaptive_concurrency` are ignored, the ones of the manager are used.
+
+        priority : int
+            The segments of the jobs with a higher priority are downloaded first. Default is 0.
+
+        mod, time_out, record_time
+            See `m3u8_downloader.start`.
+
+        Returns
+        -------
+        m3u8_downloader
+            The job.
+        """
+        with self.lock:
+            downloader._attach(self, priority, mod, time_out, record_time, len(self.jobs))
+            self.jobs.append(downloader)
+            running = bool(self.threads)
+        if running:
+            downloader._begin()
+        return downloader
+
+    def start(self):
+        """
+        Start the download threads and all jobs added so far.
+        """
+        self.session = m3u8_downloader._make_session(self.max_connections_per_host)
+        # the encrypted segments are decrypted on a thread pool, overlapping with the downloads of the next segments
+        self.decryptor = ThreadPoolExecutor(os.cpu_count() or 1)
+        with self.lock:
+            self.threads = [Thread(target=self.__work, args=('thread'+str(i),), daemon=True) for i in range(self.num_of_threads)]
+            jobs = list(self.jobs)
+        for thread in self.threads:
+            thread.start()
+        for job in jobs:
+            job._begin()
+
+    def wait(self):
+        """
+        Wait until all jobs are finished, including the ones added while waiting.
+        """
+        while True:
+            with self.lock:
+                unfinished = [job for job in self.jobs if not job.finished.is_set()]
+            if not unfinished:
+                return
+            for job in unfinished:
+                job.finished.wait()
+
+    def close(self):
+        """
+        Stop the download threads, the unfinished jobs are abandoned.
+
+        The queued segments are dropped, the threads only finish the segments they are downloading.
+        """
+        self.queue.close()
+        for thread in self.threads:
+            thread.join()
+        self.threads = []
+        if self.session is not None:
+            self.session.close()
+        if self.decryptor is not None:
+            self.decryptor.shutdown()
+
+    def run(self):
+        """
+        Start, wait until all jobs are finished and close.
+        """
+        self.start()
+        try:
+            self.wait()
+        finally:
+            self.close()
+
+    def progress(self):
+        """
+        Return the progress of every job, see `m3u8_downloader.progress`.
+        """
+        with self.lock:
+            jobs = list(self.jobs)
+        return [job.progress() for job in jobs]
+
+    def __work(self, thread_name):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            job, task = item
+            job._download(task, thread_name)
+
+def _sha256(path):
+    """@private"""
+    checksum = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024*1024), b''):
+            checksum.update(chunk)
+    return checksum.hexdigest()
+
 if __name__ == "__main__":
     a = m3u8_downloader('/mnt/c/Users/kylis/Downloads/r.m3u8',temp_file_path='.',mp4_path='./1.mp4', num_of_threads=17)
     a.start()
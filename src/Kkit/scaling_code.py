@@ -34,7 +34,9 @@ d = Data(
     )
 )
 
-extract_info_cli(d)
+# the files are parsed by worker processes, which import this script again with the "spawn" and "forkserver" start methods
+if __name__ == "__main__":
+    extract_info_cli(d)
 ```
 
 Then run the extractor:
@@ -45,6 +47,17 @@ python test.py --help
 
 # run the command
 python test.py scalability_result.txt -o test.csv
+
+# the input can be stdin or a gzip/zstd compressed file, it is parsed while reading
+zcat scalability_result.txt.gz | python test.py - -o test.csv
+python test.py scalability_result.txt.zst -o test.csv
+
+# many files, a directory or a quoted glob pattern, they are parsed by 4 processes,
+# the numbers in the file names are added as the N_nodes column
+python test.py "results/result_*_nodes.txt" -f "result_$$_nodes.txt" N_nodes -j 4 -o test.csv
+
+# split the files larger than 256 MB into chunks at the first line of the first section, and parse them in parallel
+python test.py huge_result.txt -c 256 -o test.csv
 ```
 
 The result will be saved in the test.csv file as a table:
@@ -59,14 +72,188 @@ N_threads,execution_time
 
 import re
 import pandas as pd
+import numpy as np
 import argparse
 import warnings
+import gzip
+import glob
+import io
+import os
+import sys
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
 
 
 if_warning = 0
 """@private"""
 data_pattern = r" ?(\d+\.?\d*) ?"
 """@private"""
+named_data_pattern = r" ?(?P<%sd%d>\d+\.?\d*) ?"
+"""@private"""
+
+def literal_prefix(pattern):
+    """@private
+    The plain text at the beginning of a pattern, every line it matches starts with it.
+    """
+    if has_top_level_alternation(pattern):
+        return ""   # a line may match the other branch
+    prefix = ""
+    for c in pattern:
+        if c in ".^$*+?{}[]\\|()":
+            # a quantifier may repeat or drop the character before it
+            return prefix[:-1] if c in "*?{" else prefix
+        prefix += c
+    return prefix
+
+def has_top_level_alternation(pattern):
+    """@private
+    Whether the pattern has a "|" outside of the groups and the character sets.
+    """
+    depth = 0
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if c == "\\":
+            i += 1   # the escaped character
+        elif c == "[":
+            # a "]" right after "[" or "[^" is a member of the set
+            i += 1
+            if pattern[i:i+1] == "^":
+                i += 1
+            if pattern[i:i+1] == "]":
+                i += 1
+            while i < len(pattern) and pattern[i] != "]":
+                i += 2 if pattern[i] == "\\" else 1
+        elif c == "(":
+            depth += 1
+        elif c == ")":
+            depth -= 1
+        elif c == "|" and depth == 0:
+            return True
+        i += 1
+    return False
+
+def is_compressed(magic):
+    """@private"""
+    return magic[:2] == b"\x1f\x8b" or magic[:4] == b"\x28\xb5\x2f\xfd"
+
+class BoundedReader(io.RawIOBase):
+    """@private
+    Read at most `size` bytes of `file` from its current position, `file` is not closed with the reader.
+    """
+    def __init__(self, file, size):
+        self.file = file
+        self.remaining = size
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        size = min(len(buffer), self.remaining)
+        if size <= 0:
+            return 0
+        size = self.file.readinto(memoryview(buffer)[:size])
+        self.remaining -= size
+        return size
+
+def read_lines(file_path, encoding="utf-8", start=0, end=None):
+    """@private
+    Yield the non-empty lines of a file without the line break, one by one, the file is never read into memory as a whole.
+    `file_path` "-" is stdin, a gzip or zstd compressed file is decompressed while reading.
+    With `end`, only the bytes from `start` to `end` of an uncompressed file are read.
+    """
+    file = sys.stdin.buffer if file_path == "-" else open(file_path, "rb")
+    text = None
+    try:
+        binary = file
+        if end is not None:
+            file.seek(start)
+            binary = io.BufferedReader(BoundedReader(file, end-start))
+        magic = binary.peek(4)[:4]
+        if magic[:2] == b"\x1f\x8b":
+            stream = gzip.GzipFile(fileobj=binary)
+        elif magic == b"\x28\xb5\x2f\xfd":
+            if zstandard is None:
+                raise ImportError("the zstd compressed file needs the zstandard package")
+            # a file may hold many frames, e.g. concatenated or rotated logs
+            stream = zstandard.ZstdDecompressor().stream_reader(binary, read_across_frames=True)
+        else:
+            stream = binary
+        text = io.TextIOWrapper(stream, encoding=encoding)
+        for line in text:
+            line = line.rstrip("\n")
+            if line != "":
+                yield line
+    finally:
+        if file_path == "-":
+            if text is not None:
+                text.detach()   # do not close stdin
+        else:
+            if text is not None:
+                text.close()
+            file.close()
+
+def find_files(file_path):
+    """@private
+    The files of a directory or a glob pattern, sorted by name.
+    """
+    if os.path.isdir(file_path):
+        return sorted(os.path.join(file_path, i) for i in os.listdir(file_path) if os.path.isfile(os.path.join(file_path, i)))
+    if glob.has_magic(file_path) and not os.path.exists(file_path):
+        return sorted(i for i in glob.glob(file_path, recursive=True) if os.path.isfile(i))
+    return [file_path]
+
+def split_file(file_path, line, chunk_size, encoding="utf-8"):
+    """@private
+    Split an uncompressed file into (start, end) byte ranges of about `chunk_size` bytes, every range except the first begins with a line matching `line`.
+    """
+    size = os.path.getsize(file_path)
+    bounds = [0]
+    with open(file_path, "rb") as f:
+        if is_compressed(f.peek(4)[:4]):
+            return [(0, None)]
+        for offset in range(chunk_size, size, chunk_size):
+            if offset <= bounds[-1]:
+                continue   # the last section is longer than a chunk
+            f.seek(offset)
+            f.readline()   # the rest of the line at offset
+            position = f.tell()
+            for raw in f:
+                if line.regex.match(raw.decode(encoding, errors="replace").rstrip("\r\n")):
+                    bounds.append(position)
+                    break
+                position += len(raw)
+    bounds.append(size)
+    return [(start, end) for start, end in zip(bounds[:-1], bounds[1:]) if start < end] or [(0, None)]
+
+def append_value(column, value):
+    """@private
+    Append a value to a column, the column is an array of int64 until the first float, then an array of float64.
+    Return the column, which is a new one if it is converted.
+    """
+    if column is None:
+        column = array("d" if isinstance(value, float) else "q")
+    try:
+        column.append(value)
+    except TypeError:
+        column = array("d", column)
+        column.append(value)
+    except OverflowError:
+        # larger than int64, keep the python int
+        column = list(column)
+        column.append(value)
+    return column
+
+def to_numpy(column):
+    """@private"""
+    if isinstance(column, array):
+        return np.frombuffer(column, dtype=np.int64 if column.typecode == "q" else np.float64)
+    return column
 
 def match_string(pattern, string):
     """@private"""
@@ -93,29 +280,49 @@ class Line:
             Line("number of threads: $$, execution time: $$", "number of threads", "execution time")
             ```
         """
+        self.pattern = pattern
+        """@private"""
         self.full_pattern = "^"+pattern.replace("$$", data_pattern)+"$"
         """@private"""
+        self.regex = re.compile("^"+self.named_pattern("_")+"$")
+        """@private"""
+        self.group_names = ["_d%d"%i for i in range(pattern.count("$$"))]
+        """@private"""
         self.labels = labels
         """@private"""
 
+    def named_pattern(self, prefix):
+        """@private
+        The pattern with every "$$" as a named group, `prefix` + "d0", `prefix` + "d1", ...
+        """
+        parts = self.pattern.split("$$")
+        return parts[0]+"".join(named_data_pattern%(prefix, i)+part for i, part in enumerate(parts[1:]))
+
+    def convert(self, data, line_number):
+        """@private"""
+        # the "$$" in a branch of "|" that did not match give None, only the matched values are kept like re.findall
+        data = [i for i in data if i is not None]
+        if all(["." in i for i in data]):
+            data = [float(i) for i in data]
+        else:
+            data = [int(i) for i in data]
+        if len(data)!=len(self.labels):
+            raise Exception("The number of data(%d) is differenct from lables(%d), line %d"%(len(data), len(self.labels), line_number))
+        return data
+
     def analyse(self, string, line_number):
         """@private"""
         if self.labels==tuple():
             return {}
-        if match_string(self.full_pattern, string) == False:
+        match = self.regex.match(string)
+        if match is None:
             if if_warning == 0:
                 return {}
             else:
                 warnings.warn("The line(%s) can't match the patter(%s), skip line %d"%(string, self.full_pattern, line_number))
                 return {}
 
-        data = re.findall(data_pattern, string)
-        if all(map(lambda x: "." in x, data)):
-            data = [float(i) for i in data]
-        else:
-            data = [int(i) for i in data]
-        if len(data)!=len(self.labels):
-            raise Exception("The number of data(%d) is differenct from lables(%d), line %d"%(len(data), len(self.labels), line_number))
+        data = self.convert([match.group(i) for i in self.group_names], line_number)
         return {l:d for l,d in zip(self.labels, data)}
 
 class Section:
@@ -147,28 +354,106 @@ class Data:
         """
         self.sections = Sections
         """@private"""
-    def generate(self, file_path, encoding="utf-8"):
+        # all patterns with labels are compiled once into one alternation, the name of the matched alternative ("_p0", "_p1", ...)
+        # tells which pattern the line matches, and its data groups are "_p0_d0", "_p0_d1", ...
+        ids = {}
+        for s in Sections:
+            for l in s.lines:
+                if l.labels!=tuple() and l.pattern not in ids:
+                    ids[l.pattern] = "_p%d"%len(ids)
+        # the groups of the patterns themselves can not be put into one alternation, their names may clash and their numbers
+        # (used by backreferences) would shift, then every pattern is matched by itself
+        own_groups = any(l.regex.groups != len(l.group_names) for s in Sections for l in s.lines if l.labels!=tuple())
+        self.combined = re.compile("^(?:"+"|".join("(?P<%s>%s)"%(name, Line(pattern).named_pattern(name+"_")) for pattern, name in ids.items())+")$") if ids and not own_groups else None
         """@private"""
-        with open(file_path, "r", encoding=encoding) as f:
-            lines = [i.rstrip("\n") for i in f.readlines() if i.rstrip("\n")!=""]
+        self.group_names = {name: [name+"_d%d"%i for i in range(pattern.count("$$"))] for pattern, name in ids.items()}
+        """@private"""
+        # two patterns can both match a line only if one literal prefix starts with the other, otherwise the alternative
+        # matched first is the only pattern matching the line
+        self.overlaps = {name: {other for q, other in ids.items() if other!=name and (literal_prefix(p).startswith(literal_prefix(q)) or literal_prefix(q).startswith(literal_prefix(p)))}
+                         for p, name in ids.items()}
+        """@private"""
+        # the lines of every section with the names of their alternatives, None for the lines without labels, which never match
+        self.section_lines = [[(l, ids[l.pattern] if l.labels!=tuple() else None) for l in s.lines] for s in Sections]
+        """@private"""
+
+    def generate(self, file_path, encoding="utf-8", start=0, end=None):
+        """@private"""
+        # the lines are parsed as they are read, the values are kept in typed arrays instead of lists of python objects
+        lines = read_lines(file_path, encoding, start, end)
+        # one pass for all sections, every section waits for its next line, the same as scanning the file once per section
+        indexes = [0]*len(self.sections)
+        results = [{} for _ in self.sections]
+        # the sections waiting for a line of every pattern, a section waiting for a line without labels is stuck there
+        waiting = {name: [] for name in self.group_names}
+        for n, section_lines in enumerate(self.section_lines):
+            if section_lines and section_lines[0][1] is not None:
+                waiting[section_lines[0][1]].append(n)
+        combined_match = self.combined.match if self.combined is not None else None
+        for i, line in enumerate(lines):
+            matched = []
+            if combined_match is None:
+                # the patterns are not combined, every section waiting for a pattern is checked by the pattern itself
+                for name, names in waiting.items():
+                    if names:
+                        l = self.__expected(names[0], indexes)
+                        own = l.regex.match(line)
+                        if own is not None:
+                            matched += [(n, own, l.group_names) for n in names]
+                            waiting[name] = []
+                match = None
+            else:
+                match = combined_match(line)
+            if match is not None:
+                name = match.lastgroup
+                matched = [(n, match, self.group_names[name]) for n in waiting[name]]
+                waiting[name] = []
+                for other in self.overlaps[name]:
+                    # another pattern is matched first, this one may match the line too
+                    if waiting[other]:
+                        l = self.__expected(waiting[other][0], indexes)
+                        own = l.regex.match(line)
+                        if own is not None:
+                            matched += [(n, own, l.group_names) for n in waiting[other]]
+                            waiting[other] = []
+            if if_warning != 0:
+                # the sections still waiting can't match the line
+                for names in waiting.values():
+                    for n in names:
+                        warnings.warn("The line(%s) can't match the patter(%s), skip line %d"%(line, self.__expected(n, indexes).full_pattern, i))
+            for n, m, group_names in matched:
+                l = self.__expected(n, indexes)
+                values = l.convert([m.group(g) for g in group_names], i)
+                indexes[n]+=1
+                section_lines = self.section_lines[n]
+                expected = section_lines[indexes[n]%len(section_lines)][1]
+                if expected is not None:
+                    waiting[expected].append(n)
+                result = results[n]
+                for j,k in zip(l.labels, values):
+                    result[j] = append_value(result.get(j), k)
+        # the columns are ordered section by section
         result = {}
-        for s in self.sections:
-            index = 0
-            for i, line in enumerate(lines):
-                temp = s.lines[index%len(s.lines)].analyse(line, i)
-                if temp!={}:
-                    index+=1
-                    for j,k in temp.items():
-                        if j in result:
-                            result[j].append(k)
-                        else:
-                            result[j] = [k]
-        return pd.DataFrame(result)
+        for r in results:
+            for j,k in r.items():
+                if j in result:
+                    for value in k:
+                        result[j] = append_value(result[j], value)
+                else:
+                    result[j] = k
+        return pd.DataFrame({j: to_numpy(k) for j,k in result.items()})
+
+    def __expected(self, n, indexes):
+        # the line section n is waiting for
+        section_lines = self.section_lines[n]
+        return section_lines[indexes[n]%len(section_lines)][0]
     
 def extract_info_cli(data: Data):
     """
     Initialize the command line interface for the data extractor.
 
+    The files and chunks are parsed by a process pool, call it under `if __name__ == "__main__":`, or every worker process runs the command line interface again on the platforms starting processes by "spawn" or "forkserver".
+
     Parameters
     ----------
     data : Data
@@ -177,16 +462,21 @@ def extract_info_cli(data: Data):
     parser = argparse.ArgumentParser(description="Process some files.")
 
     # Add the arguments
-    parser.add_argument("input_file", type=str, help="The name of the input file.")
+    parser.add_argument("input_file", type=str, help="The name of the input file, - for stdin. It can be compressed by gzip or zstd, a directory or a glob pattern (quoted) for many files.")
     parser.add_argument("-o", "--output_file", type=str, help="The name of the output file.")
     parser.add_argument("-e", "--encoding", default="utf-8", type=str, help="The encoding to use.")
+    parser.add_argument("-j", "--jobs", default=None, type=int, help="The number of processes parsing the files. Default is the number of CPUs.")
+    parser.add_argument("-f", "--filename", nargs="+", default=None, metavar=("PATTERN", "LABEL"), help="The pattern of the file names and the labels of its $$ fields, like \"result_$$_nodes.txt\" N_nodes.")
+    parser.add_argument("-c", "--chunk_size", default=None, type=float, help="Split the files larger than this size (MB) at the first line of the first section, and parse the chunks in parallel.")
 
     # Parse the arguments
     args = parser.parse_args()
 
-    data.generate(args.input_file, args.encoding).to_csv(args.output_file, index=False, encoding=args.encoding)
+    filename = Line(args.filename[0], *args.filename[1:]) if args.filename is not None else None
+    chunk_size = int(args.chunk_size*1024*1024) if args.chunk_size is not None else None
+    extract_info(data, args.input_file, args.encoding, filename, args.jobs, chunk_size).to_csv(args.output_file, index=False, encoding=args.encoding)
 
-def extract_info(data: Data, file_path: str, encoding="utf-8"):
+def extract_info(data: Data, file_path: str, encoding="utf-8", filename=None, max_workers=None, chunk_size=None):
     """
     Extract the data from the file.
 
@@ -198,17 +488,58 @@ def extract_info(data: Data, file_path: str, encoding="utf-8"):
         The Data object to extract the data.
 
     file_path : str
-        The path of the file.
+        The path of the file, "-" for stdin. A gzip or zstd (needs the zstandard package) compressed file is decompressed while reading.
+        A directory or a glob pattern, like "results/*.txt", means all files in it, they are parsed in parallel processes,
+        and a "source_file" column tells the file of every row.
         
     encoding: str
         The encoding of the file. Default is "utf-8".
 
+    filename : Line
+        The pattern of the file names, the data in the file name is added to every row of the file as columns.
+        For example, `Line("result_$$_nodes.txt", "N_nodes")`. Default is None.
+
+    max_workers : int
+        The number of processes. Default is None, the number of CPUs.
+
+    chunk_size : int
+        Split the uncompressed files larger than `chunk_size` bytes into chunks, every chunk starts from a line matching the first line of the first section,
+        and parse the chunks in parallel. It assumes that all sections start over at these lines, like a log of complete records. Default is None, no splitting.
+
     Returns
     -------
     pd.DataFrame
         The data extracted from the file.
     """
-    return data.generate(file_path, encoding)
+    files = find_files(file_path)
+    if files == [file_path] and filename is None and chunk_size is None:
+        return data.generate(file_path, encoding)
+    if files == []:
+        raise FileNotFoundError("No file matches %s"%file_path)
+
+    # a task is a file or a chunk of it
+    tasks = []
+    first = data.sections[0].lines[0] if data.sections and data.sections[0].lines else None
+    for path in files:
+        if chunk_size is not None and path != "-" and first is not None:
+            tasks += [(path, start, end) for start, end in split_file(path, first, chunk_size, encoding)]
+        else:
+            tasks.append((path, 0, None))
+    if len(tasks) == 1:
+        frames = [data.generate(tasks[0][0], encoding, tasks[0][1], tasks[0][2])]
+    else:
+        with ProcessPoolExecutor(max_workers) as pool:
+            frames = list(pool.map(data.generate, [t[0] for t in tasks], [encoding]*len(tasks), [t[1] for t in tasks], [t[2] for t in tasks]))
+
+    result = []
+    for (path, _, _), frame in zip(tasks, frames):
+        # the rows are tagged with the file and the data in its name
+        fields = filename.analyse(os.path.basename(path), 0) if filename is not None else {}
+        frame.insert(0, "source_file", path)
+        for i, (label, value) in enumerate(fields.items()):
+            frame.insert(i+1, label, value)
+        result.append(frame)
+    return pd.concat(result, ignore_index=True)
 
 if __name__=="__main__":
     d = Data(